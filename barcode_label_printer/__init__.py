@@ -10,10 +10,16 @@ This package provides functionality for:
 from .renderer import BarcodeGenerator, LabelRenderer
 from .printer import SvgPrinter
 
-try:
-    from .printer.niimbot import NiimbotPrinter
-    __all__ = ["BarcodeGenerator", "LabelRenderer", "SvgPrinter", "NiimbotPrinter"]
-except ImportError:
-    __all__ = ["BarcodeGenerator", "LabelRenderer", "SvgPrinter"]
+__all__ = ["BarcodeGenerator", "LabelRenderer", "SvgPrinter", "NiimbotPrinter"]
+
+
+def __getattr__(name):
+    """Import NiimbotPrinter on first access, so plain label printing doesn't load it."""
+    if name == "NiimbotPrinter":
+        from .printer import NiimbotPrinter  # pylint: disable=import-outside-toplevel
+
+        return NiimbotPrinter
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __version__ = "0.1.0"
@@ -1,9 +1,16 @@
 """Printer modules for barcode-label-printer."""
 
+from . import svg_printer
 from .svg_printer import SvgPrinter
 
-try:
-    from .niimbot.printer import NiimbotPrinter
-    __all__ = ["SvgPrinter", "NiimbotPrinter"]
-except ImportError:
-    __all__ = ["SvgPrinter"]
+__all__ = ["SvgPrinter", "NiimbotPrinter"]
+
+
+def __getattr__(name):
+    """Import NiimbotPrinter on first access, so plain label printing doesn't load it."""
+    if name == "NiimbotPrinter":
+        niimbot_printer_class = svg_printer._get_niimbot_printer_class()
+        if niimbot_printer_class is None:
+            raise ImportError("NiimbotPrinter requires pyserial and pillow")
+        return niimbot_printer_class
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -3,6 +3,13 @@
 Niimbot Packet: Niimbot printer communication packet handling
 Based on https://github.com/AndBondStyle/niimprint
 """
+import functools
+import operator
+
+
+def _checksum(type_: int, data: bytes) -> int:
+    """XOR of packet type, data length and every data byte."""
+    return functools.reduce(operator.xor, data, type_ ^ len(data))
 
 
 class NiimbotPacket:
@@ -17,43 +24,99 @@ class NiimbotPacket:
             data: Packet data
         """
         self.type = type_
-        self.data = data
+        self._data = data
+        self._bytes = None
+        self._frame = None
+
+    @property
+    def data(self) -> bytes:
+        """Packet data (copied out of the shared frame buffer for wrap_frame packets)."""
+        if not isinstance(self._data, bytes):
+            self._data = bytes(self._data)
+        return self._data
 
     @classmethod
-    def from_bytes(cls, pkt: bytes):
+    def from_bytes(cls, pkt):
         """
         Create packet from byte data.
 
         Args:
-            pkt: Byte data
+            pkt: Byte data (bytes, bytearray or memoryview)
 
         Returns:
             NiimbotPacket instance
+
+        Raises:
+            ValueError: If the frame markers, length or checksum are invalid
         """
-        assert pkt[:2] == b"\x55\x55"
-        assert pkt[-2:] == b"\xaa\xaa"
-        type_ = pkt[2]
-        len_ = pkt[3]
-        data = pkt[4 : 4 + len_]
-        checksum = type_ ^ len_
-        for i in data:
-            checksum ^= i
-        assert checksum == pkt[-3]
+        mv = memoryview(pkt)
+        if len(mv) < 7 or mv[0] != 0x55 or mv[1] != 0x55 or mv[-2] != 0xAA or mv[-1] != 0xAA:
+            raise ValueError(f"Invalid packet framing: {bytes(mv).hex()}")
+        type_ = mv[2]
+        len_ = mv[3]
+        if len(mv) != len_ + 7:
+            raise ValueError(f"Invalid packet length: {bytes(mv).hex()}")
+        data = bytes(mv[4:-3])
+        if _checksum(type_, data) != mv[-3]:
+            raise ValueError(f"Invalid packet checksum: {bytes(mv).hex()}")
         return cls(type_, data)
 
+    @classmethod
+    def wrap_frame(cls, type_: int, frame):
+        """
+        Complete a frame whose data was written in place, without copying it.
+
+        Fills in the frame markers, type, length and checksum around the data
+        at frame[4:-3]. The packet keeps a view of frame, so frame must not be
+        modified while the packet is in use; data and to_bytes() return copies.
+
+        Args:
+            type_: Packet type
+            frame: Writable buffer of len(data) + 7 bytes
+
+        Returns:
+            NiimbotPacket instance
+        """
+        mv = memoryview(frame)
+        data = mv[4:-3]
+        mv[0] = mv[1] = 0x55
+        mv[2] = type_
+        mv[3] = len(data)
+        mv[-3] = _checksum(type_, data)
+        mv[-2] = mv[-1] = 0xAA
+        packet = cls(type_, data)
+        packet._frame = mv
+        return packet
+
     def to_bytes(self) -> bytes:
         """
         Convert packet to byte data.
 
+        The encoded bytes are cached, as packets are treated as immutable.
+
         Returns:
             Byte data
         """
-        checksum = self.type ^ len(self.data)
-        for i in self.data:
-            checksum ^= i
-        return bytes(
-            (0x55, 0x55, self.type, len(self.data), *self.data, checksum, 0xAA, 0xAA)
-        )
+        if self._bytes is None:
+            if self._frame is not None:
+                self._bytes = bytes(self._frame)
+            else:
+                checksum = _checksum(self.type, self._data)
+                self._bytes = b"".join(
+                    (
+                        b"\x55\x55",
+                        bytes((self.type, len(self._data))),
+                        self._data,
+                        bytes((checksum, 0xAA, 0xAA)),
+                    )
+                )
+        return self._bytes
+
+    def _wire(self):
+        """Encoded packet without copying: the frame view for wrap_frame packets."""
+        if self._frame is not None:
+            return self._frame
+        return self.to_bytes()
 
     def __repr__(self):
         return f"<NiimbotPacket type={self.type:#04x} data={self.data.hex()}>"
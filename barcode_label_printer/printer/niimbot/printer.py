@@ -4,14 +4,16 @@ Niimbot Printer: High-level interface for Niimbot thermal printers
 Based on https://github.com/AndBondStyle/niimprint
 """
 import enum
+import functools
 import logging
-import math
 import os
+import queue
 import struct
+import threading
 import time
 
 try:
-    from PIL import Image, ImageOps
+    from PIL import Image
 
     PIL_AVAILABLE = True
 except ImportError:
@@ -19,7 +21,7 @@ except ImportError:
     logging.warning("PIL not available. Image processing will not work.")
 
 from .packet import NiimbotPacket
-from .transport import BluetoothTransport, SerialTransport
+from .transport import BluetoothTransport, SerialTransport, cached_comports, invalidate_comports
 
 
 class InfoEnum(enum.IntEnum):
@@ -55,6 +57,33 @@ class RequestCodeEnum(enum.IntEnum):
     GET_PRINT_STATUS = 163  # 0xA3
 
 
+# Response packet types signalling a failed request
+_RESP_ERROR = 219  # 0xDB
+_RESP_UNSUPPORTED = 0
+
+# Grayscale to 1-bit lookup table that inverts and thresholds in one pass:
+# dark pixels (< 128) become set bits, which the print head burns
+_PRINT_LUT = [1] * 128 + [0] * 128
+
+# Image line header: row index, three pixel counts (unused), repeat count
+_LINE_HEADER = struct.Struct(">H3BB")
+
+# Consumed bytes allowed at the front of the receive buffer before compacting
+_PACKETBUF_COMPACT_SIZE = 4096
+
+# Start-of-frame marker, used to resynchronize after a corrupt packet
+_FRAME_HEAD = b"\x55\x55"
+
+# Packets joined into each transport write when streaming image data
+_SEND_BATCH_SIZE = 32
+
+
+@functools.lru_cache(maxsize=64)
+def _request_packet(reqcode, data):
+    """Build a request packet, reusing it for repeated control commands."""
+    return NiimbotPacket(reqcode, data)
+
+
 def _packet_to_int(x):
     """Convert packet data to integer."""
     return int.from_bytes(x.data, "big")
@@ -73,7 +102,9 @@ class PrinterClient:
         """
         self._transport = transport
         self._packetbuf = bytearray()
+        self._pbuf_head = 0
         self._debug_mode = debug_mode
+        self._log_packets = os.environ.get("NIIMBOT_DEBUG") == "1"
 
     def _debug_log(self, message, *args):
         """Debug log output."""
@@ -114,8 +145,7 @@ class PrinterClient:
         self.set_dimension(image.height, image.width)
 
         self._debug_log("Sending image data")
-        for pkt in self._encode_image(image):
-            self._send(pkt)
+        self._send_many(self._encode_image(image))
 
         self._debug_log("Ending page print")
         self.end_page_print()
@@ -129,61 +159,180 @@ class PrinterClient:
 
     def _encode_image(self, image: Image):
         """Encode image to printer format."""
-        img = ImageOps.invert(image.convert("L")).convert("1")
+        img = image.convert("L").point(_PRINT_LUT, mode="1")
 
         logging.info("Processing image for printing: size=%s, mode=%s", img.size, img.mode)
 
+        # Mode "1" images are already packed MSB-first, one padded row per stride.
+        # Rows are right-aligned on the wire, so pad on the left to a byte boundary.
+        stride = (img.width + 7) // 8
+        if img.width % 8:
+            padded = Image.new("1", (stride * 8, img.height), 0)
+            padded.paste(img, (stride * 8 - img.width, 0))
+            img = padded
+        raw = memoryview(img.tobytes())
+
+        # Every line packet is built in place in one buffer for the whole image
+        data_start = 4 + _LINE_HEADER.size
+        frame_len = data_start + stride + 3
+        frames = memoryview(bytearray(frame_len * img.height))
+
         for y in range(img.height):
-            line_data = [img.getpixel((x, y)) for x in range(img.width)]
-            line_data = "".join("0" if pix == 0 else "1" for pix in line_data)
-            line_data = int(line_data, 2).to_bytes(math.ceil(img.width / 8), "big")
+            frame = frames[y * frame_len : (y + 1) * frame_len]
             counts = (0, 0, 0)
-            header = struct.pack(">H3BB", y, *counts, 1)
-            pkt = NiimbotPacket(0x85, header + line_data)
-            yield pkt
+            _LINE_HEADER.pack_into(frame, 4, y, *counts, 1)
+            frame[data_start:-3] = raw[y * stride : (y + 1) * stride]
+            yield NiimbotPacket.wrap_frame(0x85, frame)
 
     def _recv(self):
         """Receive packets."""
         packets = []
-        self._packetbuf.extend(self._transport.read(1024))
-        while len(self._packetbuf) > 4:
-            pkt_len = self._packetbuf[3] + 7
-            if len(self._packetbuf) >= pkt_len:
-                packet = NiimbotPacket.from_bytes(self._packetbuf[:pkt_len])
+        # Read only what the pending packet still needs, so a blocking read
+        # returns as soon as the reply is complete instead of at the timeout.
+        needed = self._bytes_needed()
+        while needed > 0:
+            data = self._transport.read(needed)
+            if not data:
+                break
+            self._packetbuf.extend(data)
+            needed = self._bytes_needed()
+        # Consumed packets only advance the head index; the buffer is compacted
+        # once it is fully drained or the consumed prefix grows too large.
+        with memoryview(self._packetbuf) as view:
+            while len(view) - self._pbuf_head > 4:
+                head = self._pbuf_head
+                if view[head] != 0x55 or view[head + 1] != 0x55:
+                    logging.warning("Skipping unframed bytes in receive buffer")
+                    self._pbuf_head = self._next_frame_start(head + 1)
+                    continue
+                pkt_len = view[head + 3] + 7
+                if len(view) - head < pkt_len:
+                    break
+                try:
+                    packet = NiimbotPacket.from_bytes(view[head : head + pkt_len])
+                except ValueError as e:
+                    # Drop the bad frame so later reads don't parse it again. Log the
+                    # text only; a kept log record holding the exception pins the view.
+                    logging.warning("Dropping corrupt packet: %s", str(e))
+                    self._pbuf_head = self._next_frame_start(head + 1)
+                    continue
                 self._log_buffer("recv", packet.to_bytes())
                 packets.append(packet)
-                del self._packetbuf[:pkt_len]
+                self._pbuf_head = head + pkt_len
+        if self._pbuf_head == len(self._packetbuf):
+            self._packetbuf.clear()
+            self._pbuf_head = 0
+        elif self._pbuf_head > _PACKETBUF_COMPACT_SIZE:
+            del self._packetbuf[: self._pbuf_head]
+            self._pbuf_head = 0
         return packets
 
+    def _next_frame_start(self, start):
+        """
+        Find where the next frame may begin in the receive buffer.
+
+        Args:
+            start: Buffer index to search from
+
+        Returns:
+            Index of the next frame marker (the last one in a run of 0x55 bytes);
+            a trailing 0x55 is kept as it may be the first half of a marker still
+            in transit
+        """
+        buf = self._packetbuf
+        index = buf.find(_FRAME_HEAD, start)
+        if index >= 0:
+            while index + 2 < len(buf) and buf[index + 2] == 0x55:
+                index += 1
+            return index
+        end = len(buf)
+        if end > start and buf[-1] == 0x55:
+            return end - 1
+        return end
+
+    def _bytes_needed(self):
+        """Number of bytes missing to complete the next buffered packet."""
+        pending = len(self._packetbuf) - self._pbuf_head
+        if pending < 4:
+            return 4 - pending
+        return self._packetbuf[self._pbuf_head + 3] + 7 - pending
+
     def _send(self, packet):
         """Send packet."""
         self._transport.write(packet.to_bytes())
 
+    def _send_many(self, packets):
+        """
+        Send several packets in batched transport writes.
+
+        Packets are encoded on a worker thread while the calling thread writes
+        the previous batch, so encoding overlaps with the (slower) link.
+
+        Args:
+            packets: Iterable of NiimbotPacket instances
+        """
+        batches = queue.Queue(maxsize=16)
+        stop = threading.Event()
+        errors = []
+
+        def encode():
+            try:
+                batch = []
+                for packet in packets:
+                    if stop.is_set():
+                        return
+                    batch.append(packet._wire())  # pylint: disable=protected-access
+                    if len(batch) == _SEND_BATCH_SIZE:
+                        batches.put(b"".join(batch))
+                        batch = []
+                if batch:
+                    batches.put(b"".join(batch))
+            except Exception as e:  # pylint: disable=broad-except
+                errors.append(e)
+            finally:
+                batches.put(None)
+
+        worker = threading.Thread(target=encode, daemon=True)
+        worker.start()
+        try:
+            while (data := batches.get()) is not None:
+                self._transport.write(data)
+        except BaseException:
+            # Let the worker finish so it is not left blocked on a full queue
+            stop.set()
+            while batches.get() is not None:
+                pass
+            raise
+        finally:
+            worker.join()
+
+        if errors:
+            raise errors[0]
+
     def _log_buffer(self, prefix: str, buff: bytes):
         """Log buffer content (only when NIIMBOT_DEBUG=1)."""
-        if os.environ.get("NIIMBOT_DEBUG") == "1":
-            msg = ":".join(f"{i:#04x}"[-2:] for i in buff)
-            logging.debug("%s: %s", prefix, msg)
+        if self._log_packets:
+            logging.debug("%s: %s", prefix, buff.hex(":"))
 
     def _transceive(self, reqcode, data, respoffset=1):
         """Send request and receive response."""
-        respcode = respoffset + reqcode
-        packet = NiimbotPacket(reqcode, data)
+        reqcode = int(reqcode)
+        respcode = reqcode + respoffset
+        packet = _request_packet(reqcode, data)
         self._log_buffer("send", packet.to_bytes())
         self._send(packet)
 
         resp = None
         for _ in range(6):
             for packet in self._recv():
-                if packet.type == 219:
+                if packet.type == _RESP_ERROR:
                     raise ValueError("Printer error")
-                if packet.type == 0:
+                if packet.type == _RESP_UNSUPPORTED:
                     raise NotImplementedError("Unsupported operation")
                 if packet.type == respcode:
                     resp = packet
             if resp:
                 return resp
-            time.sleep(0.1)
         return resp
 
     def get_info(self, key):
@@ -357,12 +506,22 @@ class NiimbotPrinter:
                 "PIL not available. Please install Pillow for image processing."
             )
 
+        with Image.open(image_path) as image:
+            logging.info("Loaded image %s", image_path)
+            self.print_image(image, density=density, rotate=rotate)
+
+    def print_image(self, image, density: int = 3, rotate: int = 0):
+        """
+        Print an in-memory image.
+
+        Args:
+            image: PIL image
+            density: Print density (1-5)
+            rotate: Rotation angle (0, 90, 180, 270)
+        """
         if not self.client:
             raise RuntimeError("Not connected to printer. Call connect() first.")
 
-        # Load image
-        image = Image.open(image_path)
-
         # Rotate image
         if rotate != 0:
             image = image.rotate(-int(rotate), expand=True)
@@ -389,7 +548,8 @@ class NiimbotPrinter:
                 scale_ratio,
             )
 
-            image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+            # The image is binarized for printing, so LANCZOS quality would be wasted
+            image = image.resize((new_width, new_height), Image.Resampling.BILINEAR)
             logging.info("Image scaled successfully")
 
         # Adjust density limit
@@ -399,8 +559,7 @@ class NiimbotPrinter:
 
         # Print image
         logging.info(
-            "Printing image %s (%sx%s px) with density %s",
-            image_path,
+            "Printing image (%sx%s px) with density %s",
             image.width,
             image.height,
             density,
@@ -431,19 +590,25 @@ class NiimbotPrinter:
         return info
 
     @classmethod
-    def list_serial_ports(cls):
+    def list_serial_ports(cls, refresh: bool = False):
         """
         List available serial ports.
 
+        The scan is shared with the transports and reused for COMPORTS_CACHE_TTL
+        seconds; see invalidate_serial_ports().
+
+        Args:
+            refresh: Re-scan now instead of reusing a recent scan
+
         Returns:
             list: List of serial port information dictionaries
         """
-        try:
-            from serial.tools.list_ports import comports as list_comports
-
-            ports = []
-            for port, desc, hwid in list_comports():
-                ports.append({"port": port, "description": desc, "hardware_id": hwid})
-            return ports
-        except ImportError:
-            return []
+        return [
+            {"port": port, "description": desc, "hardware_id": hwid}
+            for port, desc, hwid in cached_comports(refresh)
+        ]
+
+    @classmethod
+    def invalidate_serial_ports(cls):
+        """Forget the cached serial port scan, e.g. after a device was plugged in."""
+        invalidate_comports()
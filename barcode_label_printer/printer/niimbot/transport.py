@@ -6,18 +6,47 @@ import abc
 import logging
 import platform
 import socket
+import time
 
 from serial.tools import list_ports
 
 try:
     import serial
-    from serial.tools.list_ports import comports as list_comports
 
     SERIAL_AVAILABLE = True
 except ImportError:
     SERIAL_AVAILABLE = False
     logging.warning("pyserial not available. USB connection will not work.")
 
+# Seconds a serial port scan stays valid; enumeration is slow on Windows
+COMPORTS_CACHE_TTL = 5.0
+_comports_cache = (0.0, None)
+
+
+def cached_comports(refresh: bool = False):
+    """
+    Return the serial port list, re-scanning at most every COMPORTS_CACHE_TTL seconds.
+
+    Args:
+        refresh: Re-scan now instead of reusing a recent scan
+
+    Returns:
+        list: serial.tools.list_ports ListPortInfo entries
+    """
+    global _comports_cache  # pylint: disable=global-statement
+    scanned_at, ports = _comports_cache
+    now = time.monotonic()
+    if refresh or ports is None or now - scanned_at > COMPORTS_CACHE_TTL:
+        ports = list(list_ports.comports())
+        _comports_cache = (now, ports)
+    return ports
+
+
+def invalidate_comports():
+    """Forget the cached serial port scan, e.g. after a device was plugged in."""
+    global _comports_cache  # pylint: disable=global-statement
+    _comports_cache = (0.0, None)
+
 
 class BaseTransport(metaclass=abc.ABCMeta):
     """Base transport layer class."""
@@ -84,7 +113,7 @@ class BluetoothTransport(BaseTransport):
         """Find COM port for Bluetooth device on Windows."""
         try:
             mac_clean = mac_address.replace(":", "").upper()
-            ports = list_ports.comports()
+            ports = cached_comports()
 
             for port in ports:
                 if hasattr(port, "hwid") and mac_clean in port.hwid.upper():
@@ -135,7 +164,7 @@ class BluetoothTransport(BaseTransport):
         """Write data."""
         if self._use_serial:
             return self._serial.write(data)
-        return self._sock.send(data)
+        return self._sock.sendall(data)
 
     def close(self):
         """Close connection."""
@@ -165,7 +194,7 @@ class SerialTransport(BaseTransport):
 
     def _detect_port(self):
         """Auto-detect serial port."""
-        all_ports = list(list_comports())
+        all_ports = cached_comports()
         if len(all_ports) == 0:
             raise RuntimeError("No serial ports detected")
         if len(all_ports) > 1:
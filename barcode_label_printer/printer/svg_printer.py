@@ -2,53 +2,367 @@
 """
 SVG Printer: Print SVG files to various printers
 """
+import contextlib
+import functools
+import hashlib
 import io
 import logging
 import os
+import queue
+import re
 import shutil
 import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from xml.etree import ElementTree as ET
 
 import PyPDF2
+from PIL import Image
 
-# Windows printing imports (optional)
-WINDOWS_PRINT_AVAILABLE = False
-try:
-    import cairosvg
-    import win32api
-    import win32con
-    import win32print
-    import win32ui
-    from PIL import Image, ImageDraw, ImageWin
-
-    WINDOWS_PRINT_AVAILABLE = True
-except ImportError:
-    logging.debug(
-        "Windows printing libraries not available. Install pywin32, pillow, and cairosvg for native Windows printing."
+# Optional dependencies are imported on first use, so plain PDF printing
+# doesn't pay for loading cairo, pywin32 or the Niimbot stack.
+
+
+@functools.lru_cache(maxsize=1)
+def _get_cairosvg():
+    """Import cairosvg on first use; returns the module or None."""
+    try:
+        import cairosvg  # pylint: disable=import-outside-toplevel
+
+        return cairosvg
+    except (ImportError, OSError):
+        logging.debug("cairosvg not available. SVG to PDF conversion will use Inkscape.")
+        return None
+
+
+@functools.lru_cache(maxsize=1)
+def _get_pikepdf():
+    """Import pikepdf (faster qpdf-based parser) on first use; returns the module or None."""
+    try:
+        import pikepdf  # pylint: disable=import-outside-toplevel
+
+        return pikepdf
+    except ImportError:
+        return None
+
+
+@functools.lru_cache(maxsize=1)
+def _get_win_print_modules():
+    """Import the Windows printing modules on first use; returns a namespace or None."""
+    try:
+        # pylint: disable=import-outside-toplevel
+        import win32api
+        import win32con
+        import win32gui
+        import win32print
+        import win32ui
+        from PIL import ImageWin
+    except ImportError:
+        logging.debug(
+            "Windows printing libraries not available. Install pywin32, pillow, and cairosvg for native Windows printing."
+        )
+        return None
+    return types.SimpleNamespace(
+        win32api=win32api,
+        win32con=win32con,
+        win32gui=win32gui,
+        win32print=win32print,
+        win32ui=win32ui,
+        ImageWin=ImageWin,
     )
 
-# Niimbot printing imports (optional)
-NIIMBOT_PRINT_AVAILABLE = False
-try:
-    from .niimbot.printer import NiimbotPrinter
 
-    NIIMBOT_PRINT_AVAILABLE = True
-except ImportError:
-    logging.debug("Niimbot printing not available.")
+def _have_win_print():
+    """Whether native Windows printing (pywin32 and cairosvg) is available."""
+    return _get_win_print_modules() is not None and _get_cairosvg() is not None
+
+
+@functools.lru_cache(maxsize=1)
+def _get_niimbot_printer_class():
+    """Import NiimbotPrinter on first use; returns the class or None."""
+    try:
+        from .niimbot.printer import NiimbotPrinter  # pylint: disable=import-outside-toplevel
+
+        return NiimbotPrinter
+    except ImportError:
+        logging.debug("Niimbot printing not available.")
+        return None
+
+
+def __getattr__(name):
+    """
+    Compute the optional-dependency flags on first access.
+
+    WINDOWS_PRINT_AVAILABLE, NIIMBOT_PRINT_AVAILABLE and NiimbotPrinter used to be
+    set at import time; they are kept as lazy attributes for existing callers.
+    """
+    if name == "WINDOWS_PRINT_AVAILABLE":
+        return _have_win_print()
+    if name == "NIIMBOT_PRINT_AVAILABLE":
+        return _get_niimbot_printer_class() is not None
+    if name == "NiimbotPrinter" and _get_niimbot_printer_class() is not None:
+        return _get_niimbot_printer_class()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Seconds a printer enumeration is reused before querying the system again
+PRINTER_LIST_TTL = 5.0
+
+# Printer name in each "printer NAME is idle..." line of `lpstat -p`
+_LPSTAT_PRINTER_RE = re.compile(r"^printer\s+(\S+)", re.MULTILINE)
+
+# Windows install roots searched for Inkscape and SumatraPDF
+PROGRAM_FILES_DIRS = (r"C:\Program Files", r"C:\Program Files (x86)")
+
+# Seconds to wait for a print spooler to release a PDF before giving up on deleting it
+PDF_RELEASE_TIMEOUT = 5.0
+
+# Seconds before the first delete attempt; the shell print fallback returns before its
+# handler has opened the PDF, so an early delete would succeed and lose the job
+PDF_RELEASE_GRACE = 0.5
+
+# Seconds to wait for the PowerShell print fallback to report a status line
+PS_REPLY_TIMEOUT = 30.0
+
+# Don't allocate a console window for helper processes (Windows only)
+CREATE_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+# SVG elements cairosvg cannot render; such files are converted with Inkscape
+CAIRO_UNSUPPORTED_ELEMENTS = ("<foreignObject",)
+
+# Absolute SVG length units, per inch
+_SVG_UNITS_PER_INCH = {
+    "": 96.0, "px": 96.0, "in": 1.0, "mm": 25.4, "cm": 2.54, "pt": 72.0, "pc": 6.0
+}
+_SVG_LENGTH_RE = re.compile(r"([0-9]*\.?[0-9]+(?:[eE][-+]?[0-9]+)?)\s*(px|in|mm|cm|pt|pc)?")
+
+# Bytes read from the start of a PDF when looking for the page size
+PDF_HEAD_SCAN_SIZE = 16384
+_PDF_NUMBER = rb"\s*([-+]?(?:\d+\.?\d*|\.\d+))"
+_MEDIABOX_RE = re.compile(rb"/MediaBox\s*\[" + _PDF_NUMBER * 4 + rb"\s*\]")
+
+# Opt-in on-disk cache of rasterized labels, so reprints of an unchanged SVG skip cairosvg
+# (enable with SvgPrinter(use_raster_cache=True) or BARCODE_LABEL_PRINTER_RASTER_CACHE=1)
+RASTER_CACHE_DIR = (
+    Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "barcode-label-printer"
+)
+RASTER_CACHE_MAX_ENTRIES = 64
+
+
+def _find_in_program_files(tool_dir: str, candidates):
+    """
+    Find an executable installed under the Program Files directories.
+
+    Each root is listed once with os.scandir, and the candidate files are only
+    probed in roots where the tool's directory exists.
+
+    Args:
+        tool_dir: Installation directory name (e.g. "Inkscape")
+        candidates: Executable paths relative to the installation directory
+
+    Returns:
+        str: Path to the executable or None
+    """
+    tool_dir = tool_dir.lower()
+    for root in PROGRAM_FILES_DIRS:
+        try:
+            with os.scandir(root) as entries:
+                install_dir = next(
+                    (entry.path for entry in entries if entry.name.lower() == tool_dir),
+                    None,
+                )
+        except OSError:
+            continue
+        if install_dir is None:
+            continue
+        for candidate in candidates:
+            path = os.path.join(install_dir, candidate)
+            if os.path.isfile(path):
+                return path
+    return None
+
+
+@functools.lru_cache(maxsize=1)
+def _find_inkscape():
+    """Auto-find Inkscape executable path."""
+    inkscape_path = shutil.which("inkscape")
+    if inkscape_path:
+        return inkscape_path
+
+    return _find_in_program_files("Inkscape", ("inkscape.exe", os.path.join("bin", "inkscape.exe")))
+
+
+@functools.lru_cache(maxsize=1)
+def _find_sumatra_pdf():
+    """Auto-find SumatraPDF executable."""
+    sumatra_path = shutil.which("SumatraPDF")
+    if sumatra_path:
+        return sumatra_path
+
+    sumatra_path = _find_in_program_files("SumatraPDF", ("SumatraPDF.exe",))
+    if sumatra_path:
+        return sumatra_path
+
+    user_path = os.path.expanduser(r"~\AppData\Local\SumatraPDF\SumatraPDF.exe")
+    if os.path.exists(user_path):
+        return user_path
+    return None
+
+
+def _svg_size_inches(svg_path: str):
+    """
+    Read the physical size of an SVG from its root width/height attributes.
+
+    Args:
+        svg_path: Path to SVG file
+
+    Returns:
+        tuple: (width, height) in inches, or None if unknown or relative
+    """
+    try:
+        with open(svg_path, "rb") as f:
+            for _, root in ET.iterparse(f, events=("start",)):
+                break
+            else:
+                return None
+        size = []
+        for attr in ("width", "height"):
+            match = _SVG_LENGTH_RE.fullmatch(root.get(attr, "").strip())
+            if not match:
+                return None
+            value = float(match.group(1))
+            if value <= 0:
+                return None
+            size.append(value / _SVG_UNITS_PER_INCH[match.group(2) or ""])
+        return tuple(size)
+    except (ET.ParseError, OSError, ValueError):
+        return None
+
+
+@functools.lru_cache(maxsize=32)
+def _pdf_is_landscape(pdf_path: str, mtime_ns: int, size: int):  # pylint: disable=unused-argument
+    """
+    Check if the first page of a PDF is landscape.
+
+    The first /MediaBox is read from the head of the file, which avoids a full
+    parse; a PDF library (pikepdf if installed, else PyPDF2) is only used when
+    it isn't found there (e.g. when stored in a compressed object stream).
+    mtime_ns and size key the cache.
+
+    Args:
+        pdf_path: Path to PDF file
+        mtime_ns: File modification time
+        size: File size
+
+    Returns:
+        bool: True if the page is wider than it is tall
+    """
+    with open(pdf_path, "rb") as f:
+        match = _MEDIABOX_RE.search(f.read(PDF_HEAD_SCAN_SIZE))
+        if match:
+            x0, y0, x1, y1 = (float(value) for value in match.groups())
+            return abs(x1 - x0) > abs(y1 - y0)
+
+        f.seek(0)
+        pikepdf = _get_pikepdf()
+        if pikepdf is not None:
+            try:
+                with pikepdf.open(f) as pdf:
+                    x0, y0, x1, y1 = (float(value) for value in pdf.pages[0].mediabox)
+                return abs(x1 - x0) > abs(y1 - y0)
+            except pikepdf.PdfError as e:
+                logging.debug("pikepdf could not read %s: %s", pdf_path, e)
+                f.seek(0)
+
+        mediabox = PyPDF2.PdfReader(f).pages[0].mediabox
+        return float(mediabox.width) > float(mediabox.height)
+
+
+def _render_svg_surface(cairosvg, svg_path: str, dpi: float):
+    """
+    Rasterize an SVG and wrap the Cairo pixel buffer as a PIL image.
+
+    Skips PNG encoding and decoding. Falls back to svg2png on big-endian
+    hosts, where Cairo's native-endian ARGB32 layout is not BGRA in memory.
+
+    Args:
+        cairosvg: The cairosvg module
+        svg_path: Path to SVG file
+        dpi: DPI for conversion
+
+    Returns:
+        PIL.Image.Image: RGBA image
+    """
+    if sys.byteorder != "little":
+        png_buffer = io.BytesIO()
+        cairosvg.svg2png(url=svg_path, dpi=dpi, write_to=png_buffer)
+        png_buffer.seek(0)
+        image = Image.open(png_buffer)
+        image.load()
+        return image
+
+    tree = cairosvg.parser.Tree(url=svg_path)
+    surface = cairosvg.surface.PNGSurface(tree, None, dpi).cairo
+    surface.flush()
+    size = (surface.get_width(), surface.get_height())
+    # Cairo ARGB32 is premultiplied; "BGRa" un-premultiplies while copying
+    return Image.frombuffer(
+        "RGBA", size, bytes(surface.get_data()), "raw", "BGRa", surface.get_stride(), 1
+    )
+
+
+def _pump_lines(stream, lines):
+    """Queue each line read from a text stream, then None once it is closed."""
+    try:
+        for line in stream:
+            lines.put(line)
+    except (OSError, ValueError):
+        pass
+    lines.put(None)
+
+
+def _temp_pdf_path(prefix: str = "label-"):
+    """
+    Create an empty, uniquely named temporary PDF file.
+
+    Each print job gets its own file, so overlapping jobs for the same SVG
+    never write to or delete each other's PDF.
+
+    Args:
+        prefix: File name prefix
+
+    Returns:
+        str: Path to the new file
+    """
+    fd, path = tempfile.mkstemp(suffix=".pdf", prefix=prefix)
+    os.close(fd)
+    return path
 
 
 class SvgPrinter:
     """SVG file printing class."""
 
-    def __init__(self):
-        """Initialize SVG printer."""
+    def __init__(self, use_raster_cache: bool = None):
+        """
+        Initialize SVG printer.
+
+        Args:
+            use_raster_cache: Reuse rasterized labels from RASTER_CACHE_DIR (None reads
+                the BARCODE_LABEL_PRINTER_RASTER_CACHE=1 environment flag; off by default)
+        """
         self.current_printer = None
         self.current_printer_paper = None
         self.custom_paper_width = None  # Custom paper width (mm)
         self.custom_paper_height = None  # Custom paper height (mm)
         self.available_printers = []
-        self.inkscape_path = self._find_inkscape()
+        self._printer_list_time = None
+        self._printer_caps = {}  # Printer name -> (dpi_x, dpi_y, physical_width, physical_height)
+        self.inkscape_path = _find_inkscape()
         self._refresh_printer_list()
 
         # Niimbot printer settings
@@ -58,22 +372,63 @@ class SvgPrinter:
         self.niimbot_address = None
         self.niimbot_density = 3
 
-    def _find_inkscape(self):
-        """Auto-find Inkscape executable path."""
-        inkscape_path = shutil.which("inkscape")
-        if inkscape_path:
-            return inkscape_path
-
-        possible_paths = [
-            r"C:\\Program Files\\Inkscape\\inkscape.exe",
-            r"C:\\Program Files\\Inkscape\\bin\\inkscape.exe",
-            r"C:\\Program Files (x86)\\Inkscape\\inkscape.exe",
-            r"C:\\Program Files (x86)\\Inkscape\\bin\\inkscape.exe",
-        ]
-        for path in possible_paths:
-            if os.path.exists(path):
-                return path
-        return None
+        # Persistent PowerShell session for fallback printing (started on first use)
+        self._ps_proc = None
+        self._ps_lines = None
+        self._ps_lock = threading.Lock()
+
+        # Reuse rasterized labels from RASTER_CACHE_DIR (opt-in, writes under the user cache)
+        if use_raster_cache is None:
+            use_raster_cache = os.environ.get("BARCODE_LABEL_PRINTER_RASTER_CACHE") == "1"
+        self.use_raster_cache = use_raster_cache
+
+        # Background print jobs and temporary file cleanup
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="svg-print")
+
+    def __del__(self):
+        """Stop the worker threads and the fallback PowerShell session, if started."""
+        executor = getattr(self, "_executor", None)
+        if executor:
+            executor.shutdown(wait=False)
+
+        proc = getattr(self, "_ps_proc", None)
+        if proc and proc.poll() is None:
+            try:
+                proc.stdin.close()
+                proc.terminate()
+            except OSError:
+                pass
+
+    def _start_ps_session(self):
+        """Start the PowerShell session and a thread queueing its output lines."""
+        self._ps_proc = subprocess.Popen(
+            ["powershell", "-NoProfile", "-Command", "-"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            creationflags=CREATE_NO_WINDOW,
+        )
+        # Each session gets its own queue, so a killed session's late output is dropped
+        self._ps_lines = queue.Queue()
+        threading.Thread(
+            target=_pump_lines, args=(self._ps_proc.stdout, self._ps_lines), daemon=True
+        ).start()
+
+    def _kill_ps_session(self):
+        """Kill an unresponsive PowerShell session; the next print starts a new one."""
+        try:
+            self._ps_proc.kill()
+        except OSError:
+            pass
+        self._ps_proc = None
+        self._ps_lines = None
+
+    def refresh_tool_paths(self):
+        """Re-detect Inkscape and SumatraPDF, e.g. after installing them mid-session."""
+        _find_inkscape.cache_clear()
+        _find_sumatra_pdf.cache_clear()
+        self.inkscape_path = _find_inkscape()
 
     def _ensure_inkscape(self):
         """Ensure Inkscape is available."""
@@ -87,41 +442,58 @@ class SvgPrinter:
         return True
 
     def _refresh_printer_list(self):
-        """Refresh available printer list."""
+        """Refresh available printer list (reused for PRINTER_LIST_TTL seconds)."""
         import platform
-        
+
+        now = time.monotonic()
+        if (
+            self._printer_list_time is not None
+            and now - self._printer_list_time < PRINTER_LIST_TTL
+        ):
+            return
+        self._printer_list_time = now
+
         self.available_printers = []
+        self._printer_caps.clear()
         
         try:
             system = platform.system()
             
             if system == "Windows":
-                # Windows: Use PowerShell
-                cmd = [
-                    "powershell",
-                    "-Command",
-                    "Get-Printer | Select-Object Name | Format-Table -HideTableHeaders",
-                ]
-                result = subprocess.run(cmd, capture_output=True, text=True, shell=True)
-
-                if result.returncode == 0:
-                    for line in result.stdout.strip().split("\n"):
-                        if line.strip():
-                            self.available_printers.append(line.strip())
+                win = _get_win_print_modules()
+                if win:
+                    # Windows: Enumerate spooler printers directly (level 4 is the cheap query)
+                    win32print = win.win32print
+                    flags = win32print.PRINTER_ENUM_LOCAL | win32print.PRINTER_ENUM_CONNECTIONS
+                    self.available_printers = [
+                        info["pPrinterName"] for info in win32print.EnumPrinters(flags, None, 4)
+                    ]
                 else:
-                    logging.debug("Failed to get printer list: %s", result.stderr)
+                    # Windows without pywin32: Use PowerShell
+                    cmd = [
+                        "powershell",
+                        "-NoProfile",
+                        "-Command",
+                        "Get-Printer | Select-Object -ExpandProperty Name",
+                    ]
+                    result = subprocess.run(
+                        cmd, capture_output=True, text=True, creationflags=CREATE_NO_WINDOW
+                    )
+
+                    if result.returncode == 0:
+                        for line in result.stdout.strip().split("\n"):
+                            if line.strip():
+                                self.available_printers.append(line.strip())
+                    else:
+                        logging.debug("Failed to get printer list: %s", result.stderr)
             elif system == "Linux":
                 # Linux: Use lpstat or CUPS
                 try:
                     cmd = ["lpstat", "-p"]
                     result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
                     if result.returncode == 0:
-                        for line in result.stdout.strip().split("\n"):
-                            if line.startswith("printer"):
-                                # Extract printer name from "printer PRINTER_NAME is idle..."
-                                parts = line.split()
-                                if len(parts) > 1:
-                                    self.available_printers.append(parts[1])
+                        # Extract printer names from "printer PRINTER_NAME is idle..."
+                        self.available_printers = _LPSTAT_PRINTER_RE.findall(result.stdout)
                 except (subprocess.SubprocessError, FileNotFoundError):
                     # lpstat not available, try CUPS
                     try:
@@ -143,11 +515,7 @@ class SvgPrinter:
                     cmd = ["lpstat", "-p"]
                     result = subprocess.run(cmd, capture_output=True, text=True, timeout=5)
                     if result.returncode == 0:
-                        for line in result.stdout.strip().split("\n"):
-                            if line.startswith("printer"):
-                                parts = line.split()
-                                if len(parts) > 1:
-                                    self.available_printers.append(parts[1])
+                        self.available_printers = _LPSTAT_PRINTER_RE.findall(result.stdout)
                 except (subprocess.SubprocessError, FileNotFoundError):
                     logging.debug("lpstat not available on macOS")
             else:
@@ -234,7 +602,8 @@ class SvgPrinter:
         Returns:
             bool: True if successful
         """
-        if not NIIMBOT_PRINT_AVAILABLE:
+        niimbot_printer_class = _get_niimbot_printer_class()
+        if niimbot_printer_class is None:
             logging.error(
                 "Niimbot printing not available. Please install required dependencies."
             )
@@ -246,7 +615,7 @@ class SvgPrinter:
             self.niimbot_address = address
             self.niimbot_density = density
 
-            if model.lower() not in NiimbotPrinter.SUPPORTED_MODELS:
+            if model.lower() not in niimbot_printer_class.SUPPORTED_MODELS:
                 logging.error("Unsupported Niimbot model: %s", model)
                 return False
 
@@ -261,19 +630,29 @@ class SvgPrinter:
         """
         Get available serial ports.
 
+        The scan is shared with the Niimbot transports and briefly reused; see
+        invalidate_serial_ports().
+
         Returns:
             list: List of serial port information
         """
-        if not NIIMBOT_PRINT_AVAILABLE:
+        niimbot_printer_class = _get_niimbot_printer_class()
+        if niimbot_printer_class is None:
             return []
 
         try:
-            return NiimbotPrinter.list_serial_ports()
+            return niimbot_printer_class.list_serial_ports()
         except (ImportError, AttributeError, OSError, IOError) as e:
             logging.error("Error listing serial ports: %s", e)
             return []
 
-    def _svg_to_pdf_inkscape(self, svg_path: str, pdf_path: str = None):
+    def invalidate_serial_ports(self):
+        """Forget the cached serial port scan, e.g. after a device was plugged in."""
+        niimbot_printer_class = _get_niimbot_printer_class()
+        if niimbot_printer_class is not None:
+            niimbot_printer_class.invalidate_serial_ports()
+
+    def _svg_to_pdf_inkscape(self, svg_path: str, pdf_path: str):
         """
         Convert SVG to PDF using Inkscape.
 
@@ -284,9 +663,6 @@ class SvgPrinter:
         Returns:
             str: Path to PDF file or None
         """
-        if pdf_path is None:
-            pdf_path = str(Path(svg_path).with_suffix(".pdf"))
-
         try:
             cmd = [
                 self.inkscape_path,
@@ -305,33 +681,158 @@ class SvgPrinter:
             logging.error("Error converting SVG to PDF with Inkscape: %s", e)
             return None
 
-    def _find_sumatra_pdf(self):
-        """Auto-find SumatraPDF executable."""
-        sumatra_path = shutil.which("SumatraPDF")
-        if sumatra_path:
-            return sumatra_path
+    def _svg_to_pdf_cairo(self, svg_path: str, pdf_path: str):
+        """
+        Convert SVG to PDF in-process using cairosvg.
+
+        Args:
+            svg_path: Path to SVG file
+            pdf_path: Path to output PDF file
+
+        Returns:
+            str: Path to PDF file or None if cairosvg cannot handle the SVG
+        """
+        cairosvg = _get_cairosvg()
+        if cairosvg is None:
+            return None
+
+        try:
+            with open(svg_path, "r", encoding="utf-8", errors="ignore") as f:
+                svg_content = f.read()
+            if any(element in svg_content for element in CAIRO_UNSUPPORTED_ELEMENTS):
+                logging.debug("SVG uses elements cairosvg does not support: %s", svg_path)
+                return None
+
+            cairosvg.svg2pdf(url=svg_path, write_to=pdf_path)
+            logging.info("PDF saved to %s", pdf_path)
+            return pdf_path
+        except Exception as e:  # pylint: disable=broad-except
+            logging.warning("cairosvg PDF conversion failed: %s, trying Inkscape...", e)
+            return None
+
+    def _svg_to_pdf(self, svg_path: str, pdf_path: str = None):
+        """
+        Convert SVG to PDF, preferring cairosvg and falling back to Inkscape.
+
+        Args:
+            svg_path: Path to SVG file
+            pdf_path: Path to output PDF file (None for a new temporary file)
+
+        Returns:
+            str: Path to PDF file or None
+        """
+        if pdf_path is None:
+            pdf_path = _temp_pdf_path()
+        result = self._svg_to_pdf_cairo(svg_path, pdf_path)
+        if not result:
+            if self._ensure_inkscape():
+                result = self._svg_to_pdf_inkscape(svg_path, pdf_path)
+            else:
+                logging.error("Inkscape not available for fallback method")
+        if not result:
+            self._remove_with_retry(pdf_path)
+        return result
+
+    def _svgs_to_pdfs(self, svg_paths):
+        """
+        Convert several SVGs to PDF, using Inkscape only for those cairosvg can't handle.
+
+        Each SVG is converted into its own new temporary file.
+
+        Args:
+            svg_paths: List of SVG file paths
 
-        possible_paths = [
-            r"C:\\Program Files\\SumatraPDF\\SumatraPDF.exe",
-            r"C:\\Program Files (x86)\\SumatraPDF\\SumatraPDF.exe",
-            os.path.expanduser(r"~\AppData\Local\SumatraPDF\SumatraPDF.exe"),
+        Returns:
+            list: Paths to the PDF files (one per SVG) or None
+        """
+        pdf_paths = [_temp_pdf_path() for _ in svg_paths]
+        remaining = [
+            (svg_path, pdf_path)
+            for svg_path, pdf_path in zip(svg_paths, pdf_paths)
+            if not self._svg_to_pdf_cairo(svg_path, pdf_path)
         ]
-        for path in possible_paths:
-            if os.path.exists(path):
-                return path
-        return None
+        if remaining:
+            remaining_svgs, remaining_pdfs = (list(paths) for paths in zip(*remaining))
+            if not (
+                self._ensure_inkscape()
+                and self._svgs_to_pdfs_inkscape(remaining_svgs, remaining_pdfs)
+            ):
+                for pdf_path in pdf_paths:
+                    self._remove_with_retry(pdf_path)
+                return None
+        return pdf_paths
+
+    def _svgs_to_pdfs_inkscape(self, svg_paths, pdf_paths):
+        """
+        Convert several SVGs to PDF in a single Inkscape shell session.
+
+        Args:
+            svg_paths: List of SVG file paths
+            pdf_paths: Output PDF file paths, one per SVG
+
+        Returns:
+            list: Paths to the PDF files (one per SVG) or None
+        """
+        actions = "".join(
+            f"file-open:{svg_path}; export-type:pdf; export-filename:{pdf_path}; "
+            "export-do; file-close\n"
+            for svg_path, pdf_path in zip(svg_paths, pdf_paths)
+        )
+
+        try:
+            result = subprocess.run(
+                [self.inkscape_path, "--shell"],
+                input=actions + "quit\n",
+                capture_output=True,
+                text=True,
+            )
+        except (subprocess.SubprocessError, OSError, IOError, FileNotFoundError) as e:
+            logging.error("Error converting SVGs to PDF with Inkscape: %s", e)
+            return None
+
+        # Output files are created empty up front, so check they were written
+        missing = [
+            pdf_path
+            for pdf_path in pdf_paths
+            if not os.path.exists(pdf_path) or os.path.getsize(pdf_path) == 0
+        ]
+        if result.returncode != 0 or missing:
+            logging.error("Inkscape batch PDF conversion failed: %s", result.stderr)
+            return None
+
+        logging.info("Converted %d SVG files to PDF", len(pdf_paths))
+        return pdf_paths
+
+    def _merge_pdfs(self, pdf_paths, output_path: str):
+        """
+        Merge PDF files into one document.
+
+        Args:
+            pdf_paths: List of PDF file paths, in page order
+            output_path: Path to output PDF file
+
+        Returns:
+            str: Path to merged PDF file or None
+        """
+        try:
+            writer = PyPDF2.PdfWriter()
+            for pdf_path in pdf_paths:
+                writer.append(pdf_path)
+            with open(output_path, "wb") as f:
+                writer.write(f)
+            return output_path
+        except (ValueError, OSError, IOError, PyPDF2.errors.PyPdfError) as e:
+            logging.error("Error merging PDF files: %s", e)
+            return None
 
     def _is_pdf_landscape(self, pdf_path: str):
         """Check if PDF first page is landscape."""
         try:
-            with open(pdf_path, "rb") as f:
-                reader = PyPDF2.PdfReader(f)
-                page = reader.pages[0]
-                mediabox = page.mediabox
-                width = float(mediabox.width)
-                height = float(mediabox.height)
-                return width > height
-        except (ValueError, TypeError, AttributeError, OSError, IOError) as e:
+            stat = os.stat(pdf_path)
+            return _pdf_is_landscape(pdf_path, stat.st_mtime_ns, stat.st_size)
+        except (
+            ValueError, TypeError, AttributeError, OSError, IOError, PyPDF2.errors.PyPdfError
+        ) as e:
             logging.warning("Warning: Could not determine PDF orientation: %s", e)
             return False
 
@@ -346,7 +847,7 @@ class SvgPrinter:
         Returns:
             bool: True if successful
         """
-        sumatra_path = self._find_sumatra_pdf()
+        sumatra_path = _find_sumatra_pdf()
         if not sumatra_path:
             logging.error("SumatraPDF not found. Trying alternative methods...")
             return self._print_pdf_fallback(pdf_path, printer_name)
@@ -399,17 +900,29 @@ class SvgPrinter:
     def _print_pdf_fallback(self, pdf_path: str, printer_name: str = None):
         """Fallback print method."""
         try:
-            cmd = [
-                "powershell",
-                "-Command",
-                f'Start-Process -FilePath "{pdf_path}" -Verb Print -WindowStyle Hidden',
-            ]
-
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0:
+            # The session is shared with background print jobs; one command at a time
+            with self._ps_lock:
+                # Reuse one PowerShell session across prints to avoid its startup cost
+                if self._ps_proc is None or self._ps_proc.poll() is not None:
+                    self._start_ps_session()
+
+                # Each command answers with one status line so failures are still reported
+                command = (
+                    f'try {{ Start-Process -FilePath "{pdf_path}" -Verb Print -WindowStyle Hidden '
+                    f"-ErrorAction Stop; 'OK' }} catch {{ 'ERR ' + $_ }}\n"
+                )
+                self._ps_proc.stdin.write(command)
+                self._ps_proc.stdin.flush()
+                try:
+                    status = (self._ps_lines.get(timeout=PS_REPLY_TIMEOUT) or "").strip()
+                except queue.Empty:
+                    logging.error("PowerShell print timed out after %s seconds", PS_REPLY_TIMEOUT)
+                    self._kill_ps_session()
+                    return False
+            if status == "OK":
                 return True
             else:
-                logging.error("PowerShell print failed: %s", result.stderr)
+                logging.error("PowerShell print failed: %s", status or "session exited")
                 return False
 
         except (subprocess.SubprocessError, OSError, IOError, FileNotFoundError) as e:
@@ -434,36 +947,25 @@ class SvgPrinter:
             logging.error("Error: No printer selected. Use set_printer() first.")
             return False
 
+        have_win_print = _have_win_print()
         use_windows_native = force_direct or (
-            WINDOWS_PRINT_AVAILABLE
+            have_win_print
             and (self.custom_paper_width and self.custom_paper_height)
         )
 
-        if WINDOWS_PRINT_AVAILABLE and use_windows_native:
-            logging.info("Attempting Windows native printing (SVG → BMP → Print)...")
+        if have_win_print and use_windows_native:
+            logging.info("Attempting Windows native printing (SVG → Image → Print)...")
             try:
-                bmp_path = self._svg_to_bmp_native(svg_path)
-                if bmp_path:
-                    success = self._print_bmp_windows(bmp_path, self.current_printer)
-                    if success:
-                        logging.info("Windows native printing completed successfully")
-                        # Clean up BMP file
-                        try:
-                            os.remove(bmp_path)
-                        except (OSError, IOError, PermissionError):
-                            pass
-                        return True
+                if self._print_svg_windows(svg_path, self.current_printer):
+                    logging.info("Windows native printing completed successfully")
+                    return True
             except Exception as e:
                 logging.warning(f"Windows native printing error: {e}, trying fallback method...")
 
         # Fallback to PDF method
         logging.info("Using fallback method (SVG → PDF → Print)...")
-        if not self._ensure_inkscape():
-            logging.error("Inkscape not available for fallback method")
-            return False
-
         try:
-            pdf_path = self._svg_to_pdf_inkscape(svg_path)
+            pdf_path = self._svg_to_pdf(svg_path)
             if not pdf_path:
                 logging.error("Error: Failed to convert SVG to PDF")
                 return False
@@ -473,13 +975,7 @@ class SvgPrinter:
 
             if success:
                 logging.info("Print job sent successfully")
-                import time
-                time.sleep(0.5)
-                try:
-                    if os.path.exists(pdf_path):
-                        os.remove(pdf_path)
-                except (OSError, IOError, PermissionError) as e:
-                    logging.warning("Failed to delete PDF file: %s", e)
+                self._executor.submit(self._remove_when_released, pdf_path)
                 return True
             else:
                 logging.error("Printing failed.")
@@ -503,35 +999,25 @@ class SvgPrinter:
             logging.error("Error: SVG file not found: %s", svg_path)
             return False
 
+        have_win_print = _have_win_print()
         use_windows_native = force_direct or (
-            WINDOWS_PRINT_AVAILABLE
+            have_win_print
             and (self.custom_paper_width and self.custom_paper_height)
         )
 
-        if WINDOWS_PRINT_AVAILABLE and use_windows_native:
-            logging.info("Attempting Windows native printing (SVG → BMP → Print)...")
+        if have_win_print and use_windows_native:
+            logging.info("Attempting Windows native printing (SVG → Image → Print)...")
             try:
-                bmp_path = self._svg_to_bmp_native(svg_path)
-                if bmp_path:
-                    success = self._print_bmp_windows(bmp_path)
-                    if success:
-                        logging.info("Windows native printing completed successfully")
-                        try:
-                            os.remove(bmp_path)
-                        except (OSError, IOError, PermissionError):
-                            pass
-                        return True
+                if self._print_svg_windows(svg_path):
+                    logging.info("Windows native printing completed successfully")
+                    return True
             except Exception as e:
                 logging.warning(f"Windows native printing error: {e}, trying fallback method...")
 
         # Fallback to PDF method
         logging.info("Using fallback method (SVG → PDF → Print)...")
-        if not self._ensure_inkscape():
-            logging.error("Inkscape not available for fallback method")
-            return False
-
         try:
-            pdf_path = self._svg_to_pdf_inkscape(svg_path)
+            pdf_path = self._svg_to_pdf(svg_path)
             if not pdf_path:
                 logging.error("Error: Failed to convert SVG to PDF")
                 return False
@@ -541,13 +1027,7 @@ class SvgPrinter:
 
             if success:
                 logging.info("Print job sent successfully")
-                import time
-                time.sleep(0.5)
-                try:
-                    if os.path.exists(pdf_path):
-                        os.remove(pdf_path)
-                except (OSError, IOError, PermissionError) as e:
-                    logging.warning("Failed to delete PDF file: %s", e)
+                self._executor.submit(self._remove_when_released, pdf_path)
                 return True
             else:
                 logging.error("Printing failed.")
@@ -556,131 +1036,425 @@ class SvgPrinter:
             logging.error("Error printing SVG: %s", e)
             return False
 
-    def _svg_to_bmp_native(self, svg_path: str, bmp_path: str = None, dpi: int = 300):
+    def print_svg_async(self, svg_path: str, force_direct: bool = False):
+        """
+        Print SVG file to selected printer in a background thread.
+
+        Args:
+            svg_path: Path to SVG file
+            force_direct: Force Windows native printing
+
+        Returns:
+            concurrent.futures.Future: Resolves to True if successful
+        """
+        return self._executor.submit(self.print_svg, svg_path, force_direct)
+
+    def _remove_when_released(self, pdf_path: str):
+        """
+        Delete a printed PDF once the print application has released it.
+
+        Renaming a file onto itself fails on Windows while another process
+        still holds it open, so that is polled after a short grace period
+        (PDF_RELEASE_GRACE) that gives asynchronous print handlers time to open it.
+
+        Args:
+            pdf_path: Path to PDF file
+        """
+        time.sleep(PDF_RELEASE_GRACE)
+        deadline = time.monotonic() + PDF_RELEASE_TIMEOUT
+        while True:
+            try:
+                os.rename(pdf_path, pdf_path)
+                os.remove(pdf_path)
+                return
+            except FileNotFoundError:
+                return
+            except (OSError, IOError, PermissionError) as e:
+                if time.monotonic() >= deadline:
+                    logging.warning("Failed to delete PDF file: %s", e)
+                    return
+                time.sleep(0.05)
+
+    def print_svgs_batch(self, svg_paths):
+        """
+        Print several SVG files as a single print job.
+
+        The SVGs are converted with cairosvg, with any it cannot handle converted
+        in one Inkscape session, then merged into one PDF which is sent to the
+        selected printer (or the default printer if none is set).
+
+        Args:
+            svg_paths: List of paths to SVG files
+
+        Returns:
+            bool: True if successful
+        """
+        svg_paths = [str(svg_path) for svg_path in svg_paths]
+        if not svg_paths:
+            logging.error("Error: No SVG files given")
+            return False
+        for svg_path in svg_paths:
+            if not os.path.exists(svg_path):
+                logging.error("Error: SVG file not found: %s", svg_path)
+                return False
+
+        pdf_paths = self._svgs_to_pdfs(svg_paths)
+        if not pdf_paths:
+            logging.error("Error: Failed to convert SVG files to PDF")
+            return False
+
+        merged_path = _temp_pdf_path(prefix="batch-")
+        try:
+            merged = self._merge_pdfs(pdf_paths, merged_path)
+        finally:
+            # The pages are copied into the merged PDF; the printer never opens these
+            for pdf_path in pdf_paths:
+                self._remove_with_retry(pdf_path)
+        if not merged:
+            self._remove_with_retry(merged_path)
+            return False
+
+        target = self.current_printer or "default printer"
+        logging.info("Printing %d labels to %s...", len(svg_paths), target)
+        success = self._print_pdf(merged_path, self.current_printer)
+        if success:
+            logging.info("Batch print job sent successfully")
+            # The print handler may still be about to open the file
+            self._executor.submit(self._remove_when_released, merged_path)
+        else:
+            logging.error("Batch printing failed.")
+            self._remove_with_retry(merged_path)
+        return success
+
+    @staticmethod
+    def _remove_with_retry(path: str, attempts: int = 25, delay: float = 0.02):
         """
-        Convert SVG to BMP using cairosvg.
+        Delete a file, retrying briefly while another process still has it open.
+
+        Args:
+            path: Path to file
+            attempts: Number of delete attempts
+            delay: Seconds between attempts
+        """
+        for attempt in range(attempts):
+            try:
+                os.remove(path)
+                return
+            except FileNotFoundError:
+                return
+            except PermissionError as e:
+                if attempt == attempts - 1:
+                    logging.warning("Failed to delete PDF file: %s", e)
+                    return
+                time.sleep(delay)
+            except (OSError, IOError) as e:
+                logging.warning("Failed to delete PDF file: %s", e)
+                return
+
+    def _raster_cache_path(self, svg_path: str, dpi: int):
+        """
+        Get the raster cache file for an SVG at the given DPI and paper size.
 
         Args:
             svg_path: Path to SVG file
-            bmp_path: Path to output BMP file
             dpi: DPI for conversion
 
         Returns:
-            str: Path to BMP file or None
+            Path: Cache file path (may not exist yet)
         """
-        if not WINDOWS_PRINT_AVAILABLE:
-            logging.error("Windows printing libraries not available")
-            return None
+        mtime = os.stat(svg_path).st_mtime_ns
+        key = (
+            f"{os.path.abspath(svg_path)}|{mtime}|{dpi}"
+            f"|{self.custom_paper_width}|{self.custom_paper_height}"
+        )
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).hexdigest()
+        return RASTER_CACHE_DIR / f"{digest}.png"
 
-        if bmp_path is None:
-            bmp_path = str(Path(svg_path).with_suffix(".bmp"))
+    def _store_raster_cache(self, cache_path: Path, png_data: bytes):
+        """
+        Save rasterized PNG data and evict the least recently used entries.
 
+        Args:
+            cache_path: Cache file path
+            png_data: PNG file contents
+        """
         try:
-            png_data = cairosvg.svg2png(url=svg_path, dpi=dpi)
-            image = Image.open(io.BytesIO(png_data))
+            RASTER_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_bytes(png_data)
+            os.replace(tmp_path, cache_path)
+
+            entries = sorted(
+                os.scandir(RASTER_CACHE_DIR),
+                key=lambda entry: entry.stat().st_mtime,
+                reverse=True,
+            )
+            entries = [entry for entry in entries if entry.name.endswith(".png")]
+            for entry in entries[RASTER_CACHE_MAX_ENTRIES:]:
+                os.remove(entry.path)
+        except OSError as e:
+            logging.warning("Failed to update raster cache: %s", e)
+
+    def _svg_to_image(self, svg_path: str, dpi: int = 300):
+        """
+        Rasterize SVG to an in-memory image using cairosvg.
+
+        Results are cached on disk keyed by the SVG path, modification time,
+        DPI and custom paper size (see RASTER_CACHE_DIR).
+
+        Args:
+            svg_path: Path to SVG file
+            dpi: DPI for conversion
+
+        Returns:
+            PIL.Image.Image: RGBA image or None
+        """
+        cache_path = None
+        if self.use_raster_cache:
+            try:
+                cache_path = self._raster_cache_path(svg_path, dpi)
+                if cache_path.exists():
+                    # Touch the entry so eviction keeps recently used labels
+                    os.utime(cache_path)
+                    image = Image.open(cache_path)
+                    image.load()
+                    logging.debug("Raster cache hit for %s", svg_path)
+                    return image
+            except OSError as e:
+                logging.warning("Raster cache lookup failed: %s", e)
+
+        cairosvg = _get_cairosvg()
+        if cairosvg is None:
+            logging.error("cairosvg not available for SVG rasterization")
+            return None
 
-            if image.mode != "RGB":
-                image = image.convert("RGB")
+        try:
+            image = _render_svg_surface(cairosvg, svg_path, dpi)
+            if cache_path is not None:
+                png_buffer = io.BytesIO()
+                image.save(png_buffer, "PNG", compress_level=1)
+                self._store_raster_cache(cache_path, png_buffer.getvalue())
 
-            image.save(bmp_path, "BMP")
-            logging.info("BMP saved to %s", bmp_path)
-            return bmp_path
+            logging.debug("SVG rasterized: %dx%d", image.width, image.height)
+            return image
 
         except Exception as e:
-            logging.error("Error converting SVG to BMP: %s", e)
+            logging.error("Error rasterizing SVG: %s", e)
             return None
 
-    def _print_bmp_windows(self, bmp_path: str, printer_name: str = None):
+    def _print_image_windows(self, image, printer_name: str = None):
         """
-        Print BMP file using Windows native API.
+        Print an image using Windows native API.
 
         Args:
-            bmp_path: Path to BMP file
+            image: PIL image to print
             printer_name: Printer name (None for default)
 
         Returns:
             bool: True if successful
         """
-        if not WINDOWS_PRINT_AVAILABLE:
-            logging.error("Windows printing libraries not available")
-            return False
+        return self.print_images_windows([image], printer_name)
 
-        hdc = None
-        image = None
-        dib = None
+    def print_images_windows(self, images, printer_name: str = None):
+        """
+        Print images as the pages of a single Windows print job.
 
-        try:
-            logging.info("Starting Windows native printing...")
-            image = Image.open(bmp_path)
-            logging.debug("Image loaded: %dx%d", image.width, image.height)
+        The printer device context is created once for the whole batch.
 
-            target_printer = printer_name or win32print.GetDefaultPrinter()
-            logging.info("Target printer: %s", target_printer)
+        Args:
+            images: PIL images to print, one per page
+            printer_name: Printer name (None for default)
+
+        Returns:
+            bool: True if successful
+        """
+        return self._print_windows(
+            [lambda page_size, dpi, image=image: image for image in images], printer_name
+        )
+
+    def _print_svg_windows(self, svg_path: str, printer_name: str = None):
+        """
+        Print an SVG using Windows native API, rasterized at the printer's resolution.
+
+        The SVG is rendered directly at the size it is drawn on the page, so no
+        resampling pass is needed.
+
+        Args:
+            svg_path: Path to SVG file
+            printer_name: Printer name (None for default)
+
+        Returns:
+            bool: True if successful
+        """
+
+        def render(page_size, dpi):
+            svg_size = _svg_size_inches(svg_path)
+            if svg_size:
+                # Same 90% fit as _draw_page, expressed as a rasterization DPI
+                dpi = round(
+                    min(page_size[0] / svg_size[0], page_size[1] / svg_size[1]) * 0.9, 2
+                )
+            return self._svg_to_image(svg_path, dpi=dpi)
 
-            hdc = win32ui.CreateDC()
-            hdc.CreatePrinterDC(target_printer)
+        return self._print_windows([render], printer_name)
+
+    @contextlib.contextmanager
+    def _open_printer_dc(self, win, printer_name: str):
+        """
+        Create a device context for a printer, deleted on exit.
+
+        Args:
+            win: Windows printing modules from _get_win_print_modules()
+            printer_name: Printer name
+
+        Yields:
+            PyCDC: Printer device context
+        """
+        hdc = win.win32ui.CreateDC()
+        try:
+            hdc.CreatePrinterDC(printer_name)
             logging.debug("Printer DC created successfully")
+            yield hdc
+        finally:
+            try:
+                hdc.DeleteDC()
+            except Exception as cleanup_error:
+                logging.warning("Error during resource cleanup: %s", cleanup_error)
 
-            hdc.StartDoc("SVG Print Job")
-            hdc.StartPage()
-            logging.debug("Print document started")
+    def _page_size(self, win, hdc, printer_name: str):
+        """
+        Get the printable page size in device pixels and the printer DPI.
 
-            if (
-                self.custom_paper_width is not None
-                and self.custom_paper_height is not None
-            ):
-                dpi_x = hdc.GetDeviceCaps(win32con.LOGPIXELSX)
-                dpi_y = hdc.GetDeviceCaps(win32con.LOGPIXELSY)
-                printer_width = int(self.custom_paper_width / 25.4 * dpi_x)
-                printer_height = int(self.custom_paper_height / 25.4 * dpi_y)
-            else:
-                printer_width = hdc.GetDeviceCaps(win32con.PHYSICALWIDTH)
-                printer_height = hdc.GetDeviceCaps(win32con.PHYSICALHEIGHT)
-
-            img_width, img_height = image.size
-            scale_x = printer_width / img_width
-            scale_y = printer_height / img_height
-            scale = min(scale_x, scale_y) * 0.9
-
-            new_width = int(img_width * scale)
-            new_height = int(img_height * scale)
-            x_offset = (printer_width - new_width) // 2
-            y_offset = (printer_height - new_height) // 2
-
-            resized_image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            dib = ImageWin.Dib(resized_image)
-            dib.draw(
-                hdc.GetHandleOutput(),
-                (x_offset, y_offset, x_offset + new_width, y_offset + new_height),
+        The device caps are queried from the driver once per printer and kept
+        until the printer list is refreshed.
+
+        Args:
+            win: Windows printing modules from _get_win_print_modules()
+            hdc: Printer device context
+            printer_name: Printer name
+
+        Returns:
+            tuple: ((width, height), dpi)
+        """
+        caps = self._printer_caps.get(printer_name)
+        if caps is None:
+            caps = tuple(
+                hdc.GetDeviceCaps(index)
+                for index in (
+                    win.win32con.LOGPIXELSX,
+                    win.win32con.LOGPIXELSY,
+                    win.win32con.PHYSICALWIDTH,
+                    win.win32con.PHYSICALHEIGHT,
+                )
             )
+            self._printer_caps[printer_name] = caps
+        dpi_x, dpi_y, physical_width, physical_height = caps
+
+        if (
+            self.custom_paper_width is not None
+            and self.custom_paper_height is not None
+        ):
+            printer_width = int(self.custom_paper_width / 25.4 * dpi_x)
+            printer_height = int(self.custom_paper_height / 25.4 * dpi_y)
+        else:
+            printer_width = physical_width
+            printer_height = physical_height
+        return (printer_width, printer_height), dpi_x
 
-            hdc.EndPage()
-            hdc.EndDoc()
-            logging.debug("Print document completed")
+    def _draw_page(self, win, hdc, image, page_size):
+        """
+        Draw an image centered on a new page, scaled to 90% of the page.
+
+        Args:
+            win: Windows printing modules from _get_win_print_modules()
+            hdc: Printer device context inside StartDoc
+            image: PIL image to print
+            page_size: Printable size in device pixels
+        """
+        printer_width, printer_height = page_size
+        img_width, img_height = image.size
+        scale_x = printer_width / img_width
+        scale_y = printer_height / img_height
+        scale = min(scale_x, scale_y) * 0.9
+
+        new_width = int(img_width * scale)
+        new_height = int(img_height * scale)
+        if abs(new_width - img_width) <= 1 and abs(new_height - img_height) <= 1:
+            # Already rasterized at the target size
+            new_width, new_height = img_width, img_height
+        x_offset = (printer_width - new_width) // 2
+        y_offset = (printer_height - new_height) // 2
+
+        hdc.StartPage()
+        # Let GDI scale once while blitting (StretchDIBits) instead of resizing in Pillow
+        handle = hdc.GetHandleOutput()
+        win.win32gui.SetStretchBltMode(handle, win.win32con.HALFTONE)
+        dib = win.ImageWin.Dib(image)
+        dib.draw(
+            handle,
+            (x_offset, y_offset, x_offset + new_width, y_offset + new_height),
+        )
+        hdc.EndPage()
+
+    def _print_windows(self, renders, printer_name: str = None):
+        """
+        Print pages using Windows native API, in one print job.
+
+        Args:
+            renders: Callables, one per page, taking the printable size in device
+                pixels and the printer DPI and returning the PIL image to print
+                (or None)
+            printer_name: Printer name (None for default)
+
+        Returns:
+            bool: True if successful
+        """
+        win = _get_win_print_modules()
+        if win is None:
+            logging.error("Windows printing libraries not available")
+            return False
+
+        try:
+            logging.info("Starting Windows native printing...")
+            target_printer = printer_name or win.win32print.GetDefaultPrinter()
+            logging.info("Target printer: %s", target_printer)
+
+            with self._open_printer_dc(win, target_printer) as hdc:
+                page_size, dpi = self._page_size(win, hdc, target_printer)
+                started = False
+                try:
+                    for render in renders:
+                        image = render(page_size, dpi)
+                        if image is None:
+                            raise RuntimeError("No image to print")
+                        logging.debug("Image size: %dx%d", image.width, image.height)
+
+                        if not started:
+                            hdc.StartDoc("SVG Print Job")
+                            started = True
+                            logging.debug("Print document started")
+                        self._draw_page(win, hdc, image, page_size)
+
+                    if not started:
+                        logging.error("No images to print")
+                        return False
+                    hdc.EndDoc()
+                    logging.debug("Print document completed")
+                except Exception:
+                    if started:
+                        try:
+                            hdc.AbortDoc()
+                        except Exception:
+                            pass
+                    raise
 
             logging.info("Windows native print job sent successfully")
             return True
 
         except Exception as e:
             logging.error("Error with Windows native printing: %s", e)
-            if hdc:
-                try:
-                    hdc.AbortDoc()
-                except Exception:
-                    pass
             return False
 
-        finally:
-            try:
-                if dib:
-                    del dib
-                if image:
-                    image.close()
-                if hdc:
-                    hdc.DeleteDC()
-            except Exception as cleanup_error:
-                logging.warning("Error during resource cleanup: %s", cleanup_error)
-
     def print_svg_niimbot(self, svg_path: str, rotate: int = 0):
         """
         Print SVG file using Niimbot printer.
@@ -692,7 +1466,8 @@ class SvgPrinter:
         Returns:
             bool: True if successful
         """
-        if not NIIMBOT_PRINT_AVAILABLE:
+        niimbot_printer_class = _get_niimbot_printer_class()
+        if niimbot_printer_class is None:
             logging.error(
                 "Niimbot printing not available. Please install required dependencies."
             )
@@ -703,14 +1478,13 @@ class SvgPrinter:
             return False
 
         try:
-            # Convert SVG to BMP
-            bmp_path = self._svg_to_bmp_native(svg_path)
-            if not bmp_path:
-                logging.error("Failed to convert SVG to BMP for Niimbot printing")
+            image = self._svg_to_image(svg_path)
+            if not image:
+                logging.error("Failed to rasterize SVG for Niimbot printing")
                 return False
 
             # Connect to Niimbot printer
-            printer = NiimbotPrinter(
+            printer = niimbot_printer_class(
                 model=self.niimbot_model,
                 connection_type=self.niimbot_connection,
                 address=self.niimbot_address,
@@ -722,17 +1496,8 @@ class SvgPrinter:
 
             try:
                 # Print image
-                printer.print_image_file(
-                    bmp_path, density=self.niimbot_density, rotate=rotate
-                )
+                printer.print_image(image, density=self.niimbot_density, rotate=rotate)
                 logging.info("Niimbot print job completed successfully")
-
-                # Clean up BMP file
-                try:
-                    os.remove(bmp_path)
-                except (OSError, IOError, PermissionError):
-                    pass
-
                 return True
 
             finally:
@@ -740,9 +1505,4 @@ class SvgPrinter:
 
         except Exception as e:
             logging.error("Error printing with Niimbot: %s", e)
-            try:
-                if "bmp_path" in locals() and os.path.exists(bmp_path):
-                    os.remove(bmp_path)
-            except (OSError, IOError, PermissionError):
-                pass
             return False
@@ -2,10 +2,11 @@
 """
 Barcode Generator: Generate barcode SVG fragments
 """
+import functools
+import itertools
 import logging
 import re
 from io import BytesIO
-from xml.etree import ElementTree as ET
 
 from barcode import EAN13, Code128
 from barcode.writer import SVGWriter
@@ -16,6 +17,84 @@ BARCODE_MAP = {
     "code128": Code128,
 }
 
+# Number of generated fragments memoized across all generators
+BARCODE_CACHE_SIZE = 1024
+
+# SVGWriter options shared by every barcode, with and without human-readable text
+_WRITER_OPTIONS_TEXT = {
+    "quiet_zone": 0,
+    "unit": "mm",
+    "write_text": True,
+    "font_size": 10,  # pt
+}
+_WRITER_OPTIONS_NO_TEXT = {
+    "quiet_zone": 0,
+    "unit": "mm",
+    "write_text": False,
+    "font_size": 0,
+    "text_distance": 0,
+}
+
+# SVGWriter layout defaults reproduced by the text-less fast path
+_WRITER_MARGIN_TOP = 1.0
+_WRITER_GUARD_HEIGHT_FACTOR = 1.1
+
+# Bar rects as laid out by SVGWriter and _bars_fragment (attributes in this order)
+_RECT_RE = re.compile(r'<rect x="([^"]*)" y="([^"]*)" width="([^"]*)" height="([^"]*)"')
+
+# White background rect emitted by SVGWriter
+_WHITE_BG_MARKER = '<rect width="100%"'
+_WHITE_BG_RE = re.compile(r'<rect width="100%" height="100%" style="fill:white"\s*/?>')
+
+
+def format_number(value: float) -> str:
+    """
+    Format a coordinate compactly for SVG output.
+
+    Four decimals (0.1 um in mm units) stay far below printer resolution while
+    dropping float noise such as 1.0000000000000002.
+
+    Args:
+        value: Number to format
+
+    Returns:
+        Formatted number without trailing zeros
+    """
+    return f"{value:.4f}".rstrip("0").rstrip(".")
+
+
+def _strip_white_background(svg_fragment: str) -> str:
+    """Remove the writer's white background rect if present."""
+    if _WHITE_BG_MARKER in svg_fragment:
+        svg_fragment = _WHITE_BG_RE.sub("", svg_fragment)
+    return svg_fragment
+
+
+def _bars_fragment(code: str, module_width: float, module_height: float) -> str:
+    """
+    Lay out a barcode pattern as rects, matching SVGWriter's geometry.
+
+    Args:
+        code: Module pattern from Barcode.build() ("1" bar, "0" space, "G" guard bar)
+        module_width: Module width in mm
+        module_height: Module height in mm
+
+    Returns:
+        SVG group fragment without background or text
+    """
+    rects = []
+    xpos = 0.0
+    for module, run in itertools.groupby(code):
+        width = module_width * len(list(run))
+        if module != "0":
+            height = module_height * (_WRITER_GUARD_HEIGHT_FACTOR if module == "G" else 1)
+            rects.append(
+                f'<rect x="{xpos:.3f}" y="{_WRITER_MARGIN_TOP:.3f}" width="{width:.3f}"'
+                f' height="{height:.3f}" style="fill:black;"/>'
+            )
+        xpos += width
+    return f'<g id="barcode_group">{"".join(rects)}</g>'
+
 
 class BarcodeGenerator:
     """Generate barcode SVG fragments."""
@@ -49,12 +128,75 @@ class BarcodeGenerator:
         Returns:
             SVG fragment string (group element)
         """
+        svg_fragment, _ = self._generate(
+            barcode_type,
+            value,
+            module_height,
+            module_width,
+            write_text,
+            width_mm,
+            height_mm,
+            with_bounds=False,
+        )
+        return svg_fragment
+
+    def generate_with_bounds(
+        self,
+        barcode_type: str,
+        value: str,
+        module_height: float = 15.0,
+        module_width: float = 0.2,
+        write_text: bool = False,
+        width_mm: float = None,
+        height_mm: float = None,
+    ):
+        """
+        Generate barcode SVG fragment together with the bounding box of its bars.
+
+        Takes the same arguments as generate(). The bounds spare callers from
+        parsing the fragment again to position it.
+
+        Returns:
+            tuple: (SVG fragment string, (min_x, min_y, width, height) or None if
+            generation failed or the fragment has no bars)
+        """
+        return self._generate(
+            barcode_type,
+            value,
+            module_height,
+            module_width,
+            write_text,
+            width_mm,
+            height_mm,
+            with_bounds=True,
+        )
+
+    def _generate(
+        self,
+        barcode_type: str,
+        value: str,
+        module_height: float,
+        module_width: float,
+        write_text: bool,
+        width_mm: float,
+        height_mm: float,
+        with_bounds: bool,
+    ):
+        """
+        Generate a barcode fragment, measuring its bars only when required.
+
+        The fragment is parsed only for scaling or when with_bounds is set;
+        otherwise the writer output is returned as sliced.
+
+        Returns:
+            tuple: (SVG fragment string, bounds or None)
+        """
         # Validate value
         if not value or not isinstance(value, (str, bytes)):
             logging.warning(
                 "Barcode value is empty or invalid for type %s: %s", barcode_type, value
             )
-            return '<g id="barcode_error" />'
+            return '<g id="barcode_error" />', None
 
         # Convert value to string
         if isinstance(value, bytes):
@@ -65,129 +207,141 @@ class BarcodeGenerator:
         # Check again after conversion
         if not value:
             logging.warning("Barcode value is empty after conversion for type %s", barcode_type)
-            return '<g id="barcode_error" />'
+            return '<g id="barcode_error" />', None
 
-        # Map barcode type
-        barcode_type_key = barcode_type.lower()
-        if barcode_type_key not in self.barcode_map:
+        # Map barcode type (keys are lowercase, as callers usually pass them)
+        barcode_type_key = barcode_type if barcode_type.islower() else barcode_type.lower()
+        barcode_cls = self.barcode_map.get(barcode_type_key)
+        if barcode_cls is None:
             logging.error("Unknown barcode type: %s", barcode_type)
-            return '<g id="barcode_error" />'
+            return '<g id="barcode_error" />', None
+
+        return _generate_fragment(
+            barcode_type_key,
+            barcode_cls,
+            value,
+            module_height,
+            module_width,
+            write_text,
+            width_mm,
+            height_mm,
+            with_bounds,
+        )
 
-        barcode_cls = self.barcode_map[barcode_type_key]
 
-        writer_options = {
-            "module_height": module_height,
-            "module_width": module_width,
-            "quiet_zone": 0,
-            "unit": "mm",
-            "write_text": write_text,
-        }
+@functools.lru_cache(maxsize=BARCODE_CACHE_SIZE)
+def _generate_fragment(
+    barcode_type: str,
+    barcode_cls,
+    value: str,
+    module_height: float,
+    module_width: float,
+    write_text: bool,
+    width_mm: float,
+    height_mm: float,
+    with_bounds: bool,
+):
+    """
+    Write, slice and optionally scale a barcode fragment.
 
-        if write_text:
-            writer_options["font_size"] = 10  # pt
-        else:
-            writer_options["font_size"] = 0
-            writer_options["text_distance"] = 0
+    Output depends only on the arguments, so results are memoized; batch jobs
+    printing the same value repeatedly skip encoding and layout entirely.
 
-        try:
+    Returns:
+        tuple: (SVG fragment string, bounds or None)
+    """
+    writer_options = {
+        **(_WRITER_OPTIONS_TEXT if write_text else _WRITER_OPTIONS_NO_TEXT),
+        "module_height": module_height,
+        "module_width": module_width,
+    }
+
+    try:
+        if not write_text and module_width and module_height:
+            # Without text the writer only lays out bars, so emit them directly
+            code = barcode_cls(value).build()[0]
+            svg_fragment = _bars_fragment(code, module_width, module_height)
+        else:
             writer = SVGWriter()
             writer.set_options(writer_options)
             barcode = barcode_cls(value, writer=writer)
             output = BytesIO()
             barcode.write(output, options=writer_options)
-            svg_data = output.getvalue().decode("utf-8")
+            svg_data = output.getvalue()
 
-            # Find SVG group element
-            g_start = svg_data.find("<g")
-            g_end = svg_data.rfind("</g>")
+            # Find SVG group element, working on the writer's bytes until the slice is taken
+            g_start = svg_data.find(b"<g")
+            g_end = svg_data.rfind(b"</g>")
 
             if g_start == -1 or g_end == -1:
                 logging.warning(
                     "Could not find SVG group element in barcode output for value: %s", value
                 )
-                return '<g id="barcode_error" />'
-
-            svg_fragment = svg_data[g_start : g_end + 4]
-        except (IndexError, ValueError, AttributeError) as e:
-            logging.error(
-                "Failed to generate barcode for type %s with value '%s': %s",
-                barcode_type,
-                value,
-                str(e),
-            )
-            return '<g id="barcode_error" />'
-        except Exception as e:
-            logging.error(
-                "Unexpected error generating barcode for type %s with value '%s': %s",
-                barcode_type,
-                value,
-                str(e),
-            )
-            return '<g id="barcode_error" />'
-
-        # Parse group content and scale if needed
-        try:
-            group_element = ET.fromstring(svg_fragment)
-            rects = [
-                child
-                for child in group_element
-                if child.tag == "rect" and not child.attrib.get("width", "").endswith("%")
-            ]
-
-            if rects and (module_width or module_height) and (width_mm or height_mm):
-                # Calculate original dimensions
-                min_x = min(
-                    float(rect.attrib.get("x", "0").replace("mm", "")) for rect in rects
-                )
-                max_x = max(
-                    float(rect.attrib.get("x", "0").replace("mm", ""))
-                    + float(rect.attrib.get("width", "0").replace("mm", ""))
-                    for rect in rects
-                )
-                min_y = min(
-                    float(rect.attrib.get("y", "0").replace("mm", "")) for rect in rects
-                )
-                max_y = max(
-                    float(rect.attrib.get("y", "0").replace("mm", ""))
-                    + float(rect.attrib.get("height", "0").replace("mm", ""))
-                    for rect in rects
-                )
-                orig_w = max_x - min_x
-                orig_h = max_y - min_y
-
-                scale_x = 1.0
-                scale_y = 1.0
-                if module_width and width_mm:
-                    scale_x = width_mm / orig_w
-                elif width_mm:
-                    scale_x = width_mm / orig_w
-                if module_height and height_mm:
-                    scale_y = height_mm / orig_h
-                elif height_mm:
-                    scale_y = height_mm / orig_h
-
-                # Scale all rects
-                for rect in rects:
-                    rect.attrib["x"] = str(
-                        (float(rect.attrib.get("x", "0").replace("mm", "")) - min_x) * scale_x
-                    )
-                    rect.attrib["width"] = str(
-                        float(rect.attrib.get("width", "0").replace("mm", "")) * scale_x
-                    )
-                    rect.attrib["y"] = str(
-                        (float(rect.attrib.get("y", "0").replace("mm", "")) - min_y) * scale_y
-                    )
-                    rect.attrib["height"] = str(
-                        float(rect.attrib.get("height", "0").replace("mm", "")) * scale_y
-                    )
-                svg_fragment = ET.tostring(group_element, encoding="unicode")
-            else:
-                svg_fragment = ET.tostring(group_element, encoding="unicode")
-        except ET.ParseError as e:
-            logging.warning("Could not parse and clean barcode SVG fragment. Error: %s", e)
-
-        # Remove white background rect if present
-        svg_fragment = re.sub(
-            r'<rect width="100%" height="100%" style="fill:white"\s*/?>', "", svg_fragment
+                return '<g id="barcode_error" />', None
+
+            # Drop the writer's "mm" suffixes once so attributes are plain user units
+            svg_fragment = svg_data[g_start : g_end + 4].replace(b'mm"', b'"').decode("utf-8")
+    except (IndexError, ValueError, AttributeError) as e:
+        logging.error(
+            "Failed to generate barcode for type %s with value '%s': %s",
+            barcode_type,
+            value,
+            str(e),
         )
-        return svg_fragment
+        return '<g id="barcode_error" />', None
+    except Exception as e:
+        logging.error(
+            "Unexpected error generating barcode for type %s with value '%s': %s",
+            barcode_type,
+            value,
+            str(e),
+        )
+        return '<g id="barcode_error" />', None
+
+    # Measure bars and scale them if needed
+    bounds = None
+    if not (with_bounds or width_mm or height_mm):
+        return _strip_white_background(svg_fragment), bounds
+
+    # One regex scan reads every bar; the white background rect has no x and is skipped
+    boxes = [
+        (float(x), float(y), float(w), float(h)) for x, y, w, h in _RECT_RE.findall(svg_fragment)
+    ]
+    if boxes:
+        min_x = min(box[0] for box in boxes)
+        max_x = max(box[0] + box[2] for box in boxes)
+        min_y = min(box[1] for box in boxes)
+        max_y = max(box[1] + box[3] for box in boxes)
+        orig_w = max_x - min_x
+        orig_h = max_y - min_y
+        bounds = (min_x, min_y, orig_w, orig_h)
+
+    if boxes and (module_width or module_height) and (width_mm or height_mm):
+
+        scale_x = 1.0
+        scale_y = 1.0
+        if module_width and width_mm:
+            scale_x = width_mm / orig_w
+        elif width_mm:
+            scale_x = width_mm / orig_w
+        if module_height and height_mm:
+            scale_y = height_mm / orig_h
+        elif height_mm:
+            scale_y = height_mm / orig_h
+
+        bounds = (0.0, 0.0, orig_w * scale_x, orig_h * scale_y)
+
+        # Scale all rects in place in the markup
+        scaled = iter(boxes)
+
+        def scale_rect(_match):
+            x, y, w, h = next(scaled)
+            return (
+                f'<rect x="{format_number((x - min_x) * scale_x)}"'
+                f' y="{format_number((y - min_y) * scale_y)}"'
+                f' width="{format_number(w * scale_x)}" height="{format_number(h * scale_y)}"'
+            )
+
+        svg_fragment = _RECT_RE.sub(scale_rect, svg_fragment)
+
+    return _strip_white_background(svg_fragment), bounds
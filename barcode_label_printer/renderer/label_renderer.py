@@ -2,17 +2,173 @@
 """
 Label Renderer: Render labels from JSON configuration to SVG
 """
+import functools
 import logging
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from xml.etree import ElementTree as ET
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+try:
+    from lxml import etree as ET
+except ImportError:
+    ET = ElementTree
+
+from .barcode_generator import BarcodeGenerator, format_number
+
+# Full-size white background rect (any attribute order), as emitted by barcode writers
+_WHITE_BG_RECT_RE = re.compile(
+    r'<rect(?=[^>]*\swidth="100%")(?=[^>]*\sheight="100%")'
+    r'(?=[^>]*\sstyle="\s*fill:\s*(?:white|#ffffff)\s*;?\s*")[^>]*/>'
+)
+
+SVG_NS = "http://www.w3.org/2000/svg"
+
+# Threads writing per-element debug SVGs while the label keeps rendering
+DEBUG_WRITE_WORKERS = 4
+
+# Path separators and drive colons replaced in debug file names
+_DEBUG_FILENAME_TABLE = str.maketrans({":": "_", "/": "_", "\\": "_"})
+
+# Parsed picture files kept in memory, keyed by path and modification time
+PICTURE_CACHE_SIZE = 256
+
+# Attribute values are written double-quoted
+_ATTR_ENTITIES = {'"': "&quot;"}
+
+
+def _svg_tag(tag: str, text: str = None, **attrs) -> str:
+    """
+    Serialize a single SVG element.
+
+    Args:
+        tag: Element name
+        text: Text content (escaped), or None for an empty element
+        **attrs: Attributes; underscores in names become hyphens, None values are skipped
+
+    Returns:
+        Element markup string
+    """
+    attr_str = "".join(
+        f' {name.replace("_", "-")}="{escape(str(value), _ATTR_ENTITIES)}"'
+        for name, value in attrs.items()
+        if value is not None
+    )
+    if text is None:
+        return f"<{tag}{attr_str}/>"
+    return f"<{tag}{attr_str}>{escape(text)}</{tag}>"
+
+
+def _svg_document(
+    width: str, height: str, parts: list, view_box: str = None, pretty: bool = True
+) -> str:
+    """
+    Assemble an SVG document from pre-serialized element strings.
+
+    Args:
+        width: Document width including unit
+        height: Document height including unit
+        parts: Serialized child elements
+        view_box: Optional viewBox attribute value
+        pretty: Put each element on its own indented line
+
+    Returns:
+        SVG document string
+    """
+    newline = "\n" if pretty else ""
+    header = (
+        '<?xml version="1.0" encoding="utf-8" ?>\n<svg'
+        f' xmlns="{SVG_NS}" version="1.1" baseProfile="full"'
+        f' width="{width}" height="{height}"'
+        + (f' viewBox="{view_box}"' if view_box else "")
+        + ">"
+        + newline
+    )
+    body = "".join(f"  {part}\n" for part in parts) if pretty else "".join(parts)
+    return header + body + "</svg>\n"
+
+
+def _write_svg(path, width: str, height: str, parts: list, view_box: str = None):
+    """Write a pre-serialized SVG document to path (see _svg_document)."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(_svg_document(width, height, parts, view_box))
+
+
+@functools.lru_cache(maxsize=PICTURE_CACHE_SIZE)
+def _load_picture(svg_path: str, mtime_ns: int, size: int):  # pylint: disable=unused-argument
+    """
+    Parse a picture SVG once and return its size and serialized children.
+
+    Args:
+        svg_path: Path to the SVG file
+        mtime_ns: File modification time, part of the cache key
+        size: File size, part of the cache key
+
+    Returns:
+        tuple: (width, height, children wrapped in one <g>; empty if the SVG has no children)
+    """
+    with open(svg_path, "rb") as f:
+        svg_root = ET.fromstring(f.read())
+
+    # Extract dimensions
+    orig_w = None
+    orig_h = None
+
+    if "width" in svg_root.attrib and "height" in svg_root.attrib:
+        orig_w = float(svg_root.attrib["width"].replace("mm", "").replace("px", ""))
+        orig_h = float(svg_root.attrib["height"].replace("mm", "").replace("px", ""))
+    elif "viewBox" in svg_root.attrib:
+        viewbox = svg_root.attrib["viewBox"].split()
+        if len(viewbox) >= 4:
+            orig_w = float(viewbox[2])
+            orig_h = float(viewbox[3])
+
+    if orig_w is None or orig_h is None or orig_w <= 0 or orig_h <= 0:
+        logging.warning(
+            "Could not determine dimensions for SVG file %s, using default 100x100", svg_path
+        )
+        orig_w = 100.0
+        orig_h = 100.0
+
+    if len(svg_root) == 0:
+        return orig_w, orig_h, ""
+
+    # Serialize all children in one pass by turning the root into a plain group
+    svg_root.attrib.clear()
+    svg_root.tag = f"{{{SVG_NS}}}g" if svg_root.tag.startswith("{") else "g"
+    return orig_w, orig_h, ET.tostring(svg_root, encoding="unicode")
+
 
-import svgwrite
+class _DebugWriter:
+    """Writes the debug element SVGs of one render call on background threads."""
 
-from .barcode_generator import BarcodeGenerator
+    def __init__(self, debug_dir: Path):
+        """
+        Start the writer.
+
+        Args:
+            debug_dir: Directory receiving the element SVG files
+        """
+        self.debug_dir = debug_dir
+        self._pool = ThreadPoolExecutor(max_workers=DEBUG_WRITE_WORKERS)
+        self._writes = []
+
+    def write(self, filename: str, parts: list):
+        """Queue writing one element SVG."""
+        path = self.debug_dir / filename
+        self._writes.append((path, self._pool.submit(_write_svg, path, "100px", "100px", parts)))
+
+    def close(self):
+        """Wait for every queued write and report any that failed."""
+        self._pool.shutdown(wait=True)
+        for path, future in self._writes:
+            if future.exception() is not None:
+                logging.warning("Failed to write debug SVG %s: %s", path, future.exception())
 
 
 class RawSvgContainer:
-    """A container for raw SVG content that can be added to an svgwrite drawing."""
+    """A container for a raw SVG fragment embedded into a rendered label."""
 
     def __init__(self, raw_svg: str):
         """
@@ -24,20 +180,16 @@ class RawSvgContainer:
         if not isinstance(raw_svg, str) or not raw_svg.strip().startswith("<g"):
             raise TypeError("RawSvgContainer content must be an SVG fragment string.")
         self.raw_svg = raw_svg
+        # Strip the white background rect once; emission then writes the markup verbatim
+        self._svg = _WHITE_BG_RECT_RE.sub("", raw_svg) if 'width="100%"' in raw_svg else raw_svg
+
+    def to_svg(self) -> str:
+        """Return the fragment markup without its white background rect."""
+        return self._svg
 
     def get_xml(self):
         """Parse the raw SVG string and return it as an ElementTree element."""
-        elem = ET.fromstring(self.raw_svg)
-        # Remove white background rect if present
-        for child in list(elem):
-            if (
-                child.tag == "rect"
-                and child.attrib.get("width") == "100%"
-                and child.attrib.get("height") == "100%"
-                and child.attrib.get("style", "").replace(" ", "") in ["fill:white", "fill:#ffffff;"]
-            ):
-                elem.remove(child)
-        return elem
+        return ElementTree.fromstring(self.to_svg())
 
 
 class LabelRenderer:
@@ -74,45 +226,102 @@ class LabelRenderer:
         else:
             config_dir = Path(output_svg_path).parent
 
+        svg = self._render_document(config, config_dir, debug, debug_dir if debug else None)
+        with open(output_svg_path, "w", encoding="utf-8") as f:
+            f.write(svg)
+        logging.info(f"SVG saved to {output_svg_path}")
+
+    def render_to_string(self, config: dict, config_path: str = None) -> str:
+        """
+        Render the complete label SVG and return it instead of writing a file.
+
+        Args:
+            config: Label configuration dictionary
+            config_path: Path to the config file (for resolving relative paths;
+                the working directory is used if omitted)
+
+        Returns:
+            SVG document string
+        """
+        config_dir = Path(config_path).parent if config_path else Path(".")
+        return self._render_document(config, config_dir)
+
+    def _render_document(
+        self, config: dict, config_dir: Path, debug: bool = False, debug_dir: Path = None
+    ) -> str:
+        """Render all elements of a configuration into an SVG document string."""
         canvas_w_mm = config["canvas"]["width_mm"]
         canvas_h_mm = config["canvas"]["height_mm"]
 
-        dwg = svgwrite.Drawing(
-            output_svg_path,
-            size=(f"{canvas_w_mm}mm", f"{canvas_h_mm}mm"),
-            viewBox=f"0 0 {canvas_w_mm} {canvas_h_mm}",
-            profile="full",
-            debug=False,  # Disable validation due to bug with 'mm' units in transforms
+        # Elements are serialized as they are rendered and written out in one go
+        parts = [_svg_tag("rect", x=0, y=0, width="100%", height="100%", fill="white")]
+
+        # Render each element; debug files are written in the background, owned by this call
+        debug_writer = _DebugWriter(debug_dir) if debug and debug_dir else None
+        try:
+            for elem in config["elements"]:
+                self._render_element(elem, parts, config_dir, debug_writer)
+        finally:
+            if debug_writer:
+                debug_writer.close()
+
+        return _svg_document(
+            f"{canvas_w_mm}mm",
+            f"{canvas_h_mm}mm",
+            parts,
+            view_box=f"0 0 {canvas_w_mm} {canvas_h_mm}",
+            pretty=debug,  # printers do not need the layout; keep it readable when debugging
         )
 
-        # Add white background
-        dwg.add(dwg.rect(insert=(0, 0), size=("100%", "100%"), fill="white"))
+    def render_batch(self, jobs, max_workers: int = None) -> list:
+        """
+        Render many labels in parallel worker processes.
 
-        # Render each element
-        for elem in config["elements"]:
-            self._render_element(elem, dwg, config_dir, debug, debug_dir if debug else None)
+        Each job is independent, so rendering scales with the number of cores.
+        Small batches are rendered in this process to avoid the pool start-up cost.
+        Workers render with a copy of this renderer's barcode generator, so
+        customizations such as extra barcode_map entries apply to every job.
 
-        dwg.save(pretty=True)
-        logging.info(f"SVG saved to {output_svg_path}")
+        Args:
+            jobs: Iterable of (config, output_svg_path) or (config, output_svg_path, config_path)
+            max_workers: Number of worker processes (default: number of CPUs)
 
-    def _render_element(self, elem: dict, dwg: svgwrite.Drawing, config_dir: Path, debug: bool, debug_dir: Path = None):
+        Returns:
+            List of output SVG paths, in job order
+        """
+        jobs = [tuple(job) + (None,) * (3 - len(job)) for job in jobs]
+        if len(jobs) <= 1 or max_workers == 1:
+            for config, output_svg_path, config_path in jobs:
+                self.render(config, output_svg_path, config_path)
+            return [job[1] for job in jobs]
+
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(self.barcode_generator,),
+        ) as executor:
+            return list(executor.map(_render_job, *zip(*jobs)))
+
+    def _render_element(
+        self, elem: dict, parts: list, config_dir: Path, debug_writer: _DebugWriter = None
+    ):
         """Render a single element."""
         x_mm = elem["x_mm"]
         y_mm = elem["y_mm"]
         elem_type = elem["type"]
 
         if elem_type == "barcode":
-            self._render_barcode(elem, dwg, x_mm, y_mm)
+            self._render_barcode(elem, parts, x_mm, y_mm)
         elif elem_type == "text":
-            self._render_text(elem, dwg, x_mm, y_mm, debug, debug_dir)
+            self._render_text(elem, parts, x_mm, y_mm, debug_writer)
         elif elem_type == "box":
-            self._render_box(elem, dwg, x_mm, y_mm, debug, debug_dir)
+            self._render_box(elem, parts, x_mm, y_mm, debug_writer)
         elif elem_type == "picture":
-            self._render_picture(elem, dwg, x_mm, y_mm, config_dir, debug, debug_dir)
+            self._render_picture(elem, parts, x_mm, y_mm, config_dir, debug_writer)
         else:
             logging.warning("Unknown element type: %s", elem_type)
 
-    def _render_barcode(self, elem: dict, dwg: svgwrite.Drawing, x_mm: float, y_mm: float):
+    def _render_barcode(self, elem: dict, parts: list, x_mm: float, y_mm: float):
         """Render a barcode element."""
         barcode_options = {
             "module_height": elem.get("height_mm", 9),
@@ -121,7 +330,7 @@ class LabelRenderer:
             "width_mm": elem.get("width_mm"),
             "height_mm": elem.get("height_mm"),
         }
-        barcode_svg_str = self.barcode_generator.generate(
+        barcode_svg_str, bounds = self.barcode_generator.generate_with_bounds(
             elem["barcode_type"], elem["value"], **barcode_options
         )
 
@@ -131,50 +340,13 @@ class LabelRenderer:
                 "Skipping barcode element %s due to generation error", elem.get("id", "unknown")
             )
             return
-
-        # Parse group to get actual dimensions
-        try:
-            group_element = ET.fromstring(barcode_svg_str)
-        except ET.ParseError as e:
+        if bounds is None:
             logging.error(
-                "Failed to parse barcode SVG for element %s: %s",
-                elem.get("id", "unknown"),
-                str(e),
+                "Could not determine barcode bounds for element %s", elem.get("id", "unknown")
             )
             return
 
-        rects = [
-            child
-            for child in group_element
-            if child.tag == "rect" and not child.attrib.get("width", "").endswith("%")
-        ]
-
-        min_x = (
-            min(float(rect.attrib.get("x", "0").replace("mm", "")) for rect in rects) if rects else 0
-        )
-        max_x = (
-            max(
-                float(rect.attrib.get("x", "0").replace("mm", ""))
-                + float(rect.attrib.get("width", "0").replace("mm", ""))
-                for rect in rects
-            )
-            if rects
-            else 1
-        )
-        min_y = (
-            min(float(rect.attrib.get("y", "0").replace("mm", "")) for rect in rects) if rects else 0
-        )
-        max_y = (
-            max(
-                float(rect.attrib.get("y", "0").replace("mm", ""))
-                + float(rect.attrib.get("height", "0").replace("mm", ""))
-                for rect in rects
-            )
-            if rects
-            else 1
-        )
-        orig_w = max_x - min_x
-        orig_h = max_y - min_y
+        min_x, min_y, orig_w, orig_h = bounds
 
         # Calculate scale & translate
         scale_x = elem.get("width_mm", orig_w) / orig_w if orig_w > 0 else 1
@@ -183,12 +355,16 @@ class LabelRenderer:
         translate_y = elem.get("y_mm", 0) - min_y * scale_y
 
         # Apply matrix transform
-        transform = f"matrix({scale_x},0,0,{scale_y},{translate_x},{translate_y})"
-        transform_group = dwg.g(transform=transform)
-        transform_group.add(RawSvgContainer(barcode_svg_str))
-        dwg.add(transform_group)
+        transform = (
+            f"matrix({format_number(scale_x)},0,0,{format_number(scale_y)},"
+            f"{format_number(translate_x)},{format_number(translate_y)})"
+        )
+        # The cached fragment already has its white background stripped; emit it as is
+        parts.append(f'<g transform="{transform}">{barcode_svg_str}</g>')
 
-    def _render_text(self, elem: dict, dwg: svgwrite.Drawing, x_mm: float, y_mm: float, debug: bool, debug_dir: Path = None):
+    def _render_text(
+        self, elem: dict, parts: list, x_mm: float, y_mm: float, debug_writer: _DebugWriter = None
+    ):
         """Render a text element."""
         font_weight = "bold" if elem.get("bold") else "normal"
         font_size_pt = elem.get("font_size_pt", 10)
@@ -201,9 +377,11 @@ class LabelRenderer:
         bg_color = elem.get("bg_color", None)
 
         # Create text element
-        text_element = dwg.text(
+        text_element = _svg_tag(
+            "text",
             elem["value"],
-            insert=(x_mm, y_mm),
+            x=x_mm,
+            y=y_mm,
             font_size=font_size_mm,
             font_family="Arial",
             font_weight=font_weight,
@@ -220,49 +398,49 @@ class LabelRenderer:
                 est_text_width_mm += (len(elem["value"]) - 1) * letter_spacing_mm
             est_text_height_mm = font_size_mm * 1.1
 
-            bg_rect = dwg.rect(
-                insert=(x_mm, y_mm),
-                size=(est_text_width_mm, est_text_height_mm),
+            bg_rect = _svg_tag(
+                "rect",
+                x=x_mm,
+                y=y_mm,
+                width=est_text_width_mm,
+                height=est_text_height_mm,
                 fill=bg_color,
                 stroke="none",
             )
-            dwg.add(bg_rect)
+            parts.append(bg_rect)
 
-        dwg.add(text_element)
+        parts.append(text_element)
 
-        if debug and debug_dir:
-            sanitized_text_data = (
-                elem["value"].replace(":", "_").replace("/", "_").replace("\\", "_")
-            )
-            debug_text_path = debug_dir / f"text_{sanitized_text_data}.svg"
-            debug_dwg = svgwrite.Drawing(
-                debug_text_path, size=("100px", "100px"), profile="full"
-            )
-            if bg_color and bg_rect:
-                debug_dwg.add(bg_rect)
-            debug_dwg.add(text_element)
-            debug_dwg.save()
+        if debug_writer:
+            sanitized_text_data = elem["value"].translate(_DEBUG_FILENAME_TABLE)
+            debug_parts = [bg_rect, text_element] if bg_rect else [text_element]
+            debug_writer.write(f"text_{sanitized_text_data}.svg", debug_parts)
 
-    def _render_box(self, elem: dict, dwg: svgwrite.Drawing, x_mm: float, y_mm: float, debug: bool, debug_dir: Path = None):
+    def _render_box(
+        self, elem: dict, parts: list, x_mm: float, y_mm: float, debug_writer: _DebugWriter = None
+    ):
         """Render a box element."""
         width_mm = elem["width_mm"]
         height_mm = elem["height_mm"]
         fill_color = elem.get("fill_color", "black")
 
-        box_element = dwg.rect(
-            insert=(x_mm, y_mm), size=(width_mm, height_mm), fill=fill_color
+        box_element = _svg_tag(
+            "rect", x=x_mm, y=y_mm, width=width_mm, height=height_mm, fill=fill_color
         )
-        dwg.add(box_element)
+        parts.append(box_element)
 
-        if debug and debug_dir:
-            debug_box_path = debug_dir / f"box_at_{x_mm}_{y_mm}.svg"
-            debug_dwg = svgwrite.Drawing(
-                debug_box_path, size=("100px", "100px"), profile="full"
-            )
-            debug_dwg.add(box_element)
-            debug_dwg.save()
+        if debug_writer:
+            debug_writer.write(f"box_at_{x_mm}_{y_mm}.svg", [box_element])
 
-    def _render_picture(self, elem: dict, dwg: svgwrite.Drawing, x_mm: float, y_mm: float, config_dir: Path, debug: bool, debug_dir: Path = None):
+    def _render_picture(
+        self,
+        elem: dict,
+        parts: list,
+        x_mm: float,
+        y_mm: float,
+        config_dir: Path,
+        debug_writer: _DebugWriter = None,
+    ):
         """Render a picture element."""
         svg_file = elem.get("svg_file")
         if not svg_file:
@@ -272,9 +450,11 @@ class LabelRenderer:
             )
             return
 
-        # Resolve SVG file path
+        # Resolve SVG file path; the stat result also keys the picture cache
         svg_path = config_dir / svg_file
-        if not svg_path.exists():
+        try:
+            stat = svg_path.stat()
+        except OSError:
             logging.warning(
                 "SVG file not found for picture element %s: %s, skipping",
                 elem.get("id", "unknown"),
@@ -283,33 +463,8 @@ class LabelRenderer:
             return
 
         try:
-            # Load and parse SVG
-            with open(svg_path, "r", encoding="utf-8") as f:
-                svg_content = f.read()
-
-            svg_tree = ET.parse(svg_path)
-            svg_root = svg_tree.getroot()
-
-            # Extract dimensions
-            orig_w = None
-            orig_h = None
-
-            if "width" in svg_root.attrib and "height" in svg_root.attrib:
-                orig_w = float(svg_root.attrib["width"].replace("mm", "").replace("px", ""))
-                orig_h = float(svg_root.attrib["height"].replace("mm", "").replace("px", ""))
-            elif "viewBox" in svg_root.attrib:
-                viewbox = svg_root.attrib["viewBox"].split()
-                if len(viewbox) >= 4:
-                    orig_w = float(viewbox[2])
-                    orig_h = float(viewbox[3])
-
-            if orig_w is None or orig_h is None or orig_w <= 0 or orig_h <= 0:
-                logging.warning(
-                    "Could not determine dimensions for SVG file %s, using default 100x100",
-                    svg_path
-                )
-                orig_w = 100.0
-                orig_h = 100.0
+            # Load the parsed picture, reused while the file is unchanged
+            orig_w, orig_h, children = _load_picture(str(svg_path), stat.st_mtime_ns, stat.st_size)
 
             # Calculate scale
             target_w = elem.get("width_mm")
@@ -328,11 +483,7 @@ class LabelRenderer:
                 scale_x = 1.0
                 scale_y = 1.0
 
-            # Extract inner content
-            svg_root_parsed = ET.fromstring(svg_content)
-            inner_elements = list(svg_root_parsed)
-
-            if not inner_elements:
+            if not children:
                 logging.warning(
                     "SVG file %s appears to be empty, skipping picture element %s",
                     svg_path,
@@ -340,33 +491,13 @@ class LabelRenderer:
                 )
                 return
 
-            # Create transform group
+            # Create transform group holding each child element
             transform = f"translate({x_mm},{y_mm}) scale({scale_x},{scale_y})"
-            transform_group = dwg.g(transform=transform)
-
-            # Add each child element
-            for child in inner_elements:
-                child_str = ET.tostring(child, encoding="unicode")
-                wrapped_str = f"<g>{child_str}</g>"
-                try:
-                    transform_group.add(RawSvgContainer(wrapped_str))
-                except (TypeError, ValueError) as e:
-                    logging.warning(
-                        "Could not add SVG element from %s: %s, skipping",
-                        svg_path,
-                        e
-                    )
-                    continue
-
-            dwg.add(transform_group)
-
-            if debug and debug_dir:
-                debug_picture_path = debug_dir / f"picture_{elem.get('id', 'unknown')}.svg"
-                debug_dwg = svgwrite.Drawing(
-                    debug_picture_path, size=("100px", "100px"), profile="full"
-                )
-                debug_dwg.add(transform_group)
-                debug_dwg.save()
+            transform_group = f'<g transform="{transform}">{children}</g>'
+            parts.append(transform_group)
+
+            if debug_writer:
+                debug_writer.write(f"picture_{elem.get('id', 'unknown')}.svg", [transform_group])
 
         except Exception as e:
             logging.error(
@@ -375,3 +506,20 @@ class LabelRenderer:
                 e,
                 exc_info=True
             )
+
+
+# Renderer owned by each render_batch worker process
+_worker_renderer = None
+
+
+def _init_worker(barcode_generator: BarcodeGenerator):
+    """Create the worker's renderer once instead of pickling one per job."""
+    global _worker_renderer  # pylint: disable=global-statement
+    _worker_renderer = LabelRenderer()
+    _worker_renderer.barcode_generator = barcode_generator
+
+
+def _render_job(config: dict, output_svg_path: str, config_path: str = None) -> str:
+    """Render one batch job in a worker process."""
+    _worker_renderer.render(config, output_svg_path, config_path)
+    return output_svg_path
@@ -0,0 +1,115 @@
+"""
+Shared pytest fixtures
+"""
+import json
+import re
+from pathlib import Path
+
+import pytest
+
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+from barcode_label_printer import BarcodeGenerator, LabelRenderer, SvgPrinter
+
+# Repository root, where the sample label configs live
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+# Opening <svg> tag, searched for in the document head only (pos/endpos, no slicing)
+_SVG_HEAD_RE = re.compile(rb"<svg\b", re.I)
+_SVG_HEAD_TEXT_RE = re.compile(r"<svg\b", re.I)
+_SVG_HEAD_SIZE = 256
+
+
+@pytest.fixture(scope="module")
+def renderer():
+    """Label renderer shared by the tests of a module."""
+    return LabelRenderer()
+
+
+@pytest.fixture(scope="module")
+def generator():
+    """Barcode generator shared by the tests of a module."""
+    return BarcodeGenerator()
+
+
+@pytest.fixture(autouse=True)
+def _no_printer_enumeration(request, monkeypatch):
+    """Keep SvgPrinter() off the OS printer subsystem unless the test is marked integration."""
+    if request.node.get_closest_marker("integration") is None:
+        monkeypatch.setattr(SvgPrinter, "_refresh_printer_list", lambda self: None)
+
+
+@pytest.fixture(scope="session")
+def available_printers():
+    """System printer list, enumerated once per session (spawns lpstat or queries winspool)."""
+    return SvgPrinter().get_available_printers()
+
+
+@pytest.fixture(scope="session")
+def has_svg_head():
+    """
+    Check for an opening <svg> tag in the head of an SVG document.
+
+    Returns:
+        Function taking the document as bytes or str and returning whether it matches
+    """
+
+    def check(content):
+        pattern = _SVG_HEAD_RE if isinstance(content, bytes) else _SVG_HEAD_TEXT_RE
+        return pattern.search(content, 0, _SVG_HEAD_SIZE) is not None
+
+    return check
+
+
+@pytest.fixture(scope="session")
+def label_config():
+    """Label config with one text, barcode and box element."""
+    return {
+        "canvas": {"width_mm": 100, "height_mm": 50},
+        "elements": [
+            {
+                "type": "text",
+                "value": "Test Label",
+                "x_mm": 5,
+                "y_mm": 5,
+                "font_size_pt": 12,
+                "bold": True,
+            },
+            {
+                "type": "barcode",
+                "barcode_type": "code128",
+                "value": "123456789012",
+                "x_mm": 5,
+                "y_mm": 15,
+                "width_mm": 80,
+                "height_mm": 20,
+                "write_text": False,
+            },
+            {
+                "type": "box",
+                "x_mm": 5,
+                "y_mm": 40,
+                "width_mm": 90,
+                "height_mm": 5,
+                "fill_color": "black",
+            },
+        ],
+    }
+
+
+@pytest.fixture(scope="session")
+def rendered_label(label_config):
+    """SVG document of label_config, rendered once and shared by the tests that check it."""
+    return LabelRenderer().render_to_string(label_config)
+
+
+@pytest.fixture(scope="session")
+def sample_configs():
+    """Sample label configs from the repository root and tests/, parsed once per session."""
+    files = sorted(ROOT_DIR.glob("*.json")) + sorted((ROOT_DIR / "tests").glob("*.json"))
+    return {path: _json_loads(path.read_bytes()) for path in files}
@@ -1,35 +1,95 @@
 """
 Tests for barcode generator
 """
+from io import BytesIO
+from xml.etree import ElementTree
+
 import pytest
+from barcode.writer import SVGWriter
+
 from barcode_label_printer import BarcodeGenerator
+from barcode_label_printer.renderer import barcode_generator
 
+SVG_RECT = "{http://www.w3.org/2000/svg}rect"
 
-def test_generate_code128():
-    """Test Code128 barcode generation."""
-    generator = BarcodeGenerator()
-    result = generator.generate("code128", "123456789012")
+
+@pytest.mark.parametrize(
+    "barcode_type,value,error",
+    [
+        ("code128", "123456789012", False),
+        ("ean13", "1234567890128", False),
+        ("invalid", "123456789012", True),
+        ("code128", "", True),
+    ],
+    ids=["code128", "ean13", "invalid_type", "empty_value"],
+)
+def test_generate(generator, barcode_type, value, error):
+    """Test barcode generation and its error fragment."""
+    result = generator.generate(barcode_type, value)
     assert result.startswith("<g")
-    assert 'id="barcode_error"' not in result
+    assert ('id="barcode_error"' in result) is error
 
 
-def test_generate_ean13():
-    """Test EAN13 barcode generation."""
-    generator = BarcodeGenerator()
-    result = generator.generate("ean13", "1234567890128")
-    assert result.startswith("<g")
-    assert 'id="barcode_error"' not in result
+def test_generate_with_bounds(generator):
+    """Test scaled barcode bounds are returned with the fragment."""
+    fragment, bounds = generator.generate_with_bounds(
+        "code128", "123456789012", width_mm=40, height_mm=10
+    )
+    assert 'id="barcode_error"' not in fragment
+    # The renderer embeds the fragment verbatim, so the background must already be gone
+    assert 'width="100%"' not in fragment
+    assert bounds == pytest.approx((0, 0, 40, 10))
+
+
+def test_generate_with_bounds_error(generator):
+    """Test failed generation returns no bounds."""
+    fragment, bounds = generator.generate_with_bounds("invalid", "123456789012")
+    assert 'id="barcode_error"' in fragment
+    assert bounds is None
+
+
+def test_generate_unitless(generator):
+    """Test unscaled barcode attributes are plain user units."""
+    result = generator.generate("code128", "123456789012")
+    assert 'mm"' not in result
+
+
+def test_generate_cached(generator):
+    """Test repeated barcodes are served from the fragment cache."""
+    barcode_generator._generate_fragment.cache_clear()
+    first = generator.generate("code128", "123456789012", width_mm=40, height_mm=10)
+    second = BarcodeGenerator().generate("CODE128", b"123456789012", width_mm=40, height_mm=10)
+    assert first == second
+    assert barcode_generator._generate_fragment.cache_info().hits == 1
+
 
+@pytest.mark.parametrize(
+    "barcode_type,value", [("code128", "ABC-123"), ("ean13", "4712010086313")]
+)
+def test_bars_fragment_matches_writer(barcode_type, value):
+    """Test the text-less fast path lays out the same rects as SVGWriter."""
+    options = {"module_height": 9, "module_width": 0.33, "quiet_zone": 0, "write_text": False}
+    barcode_cls = barcode_generator.BARCODE_MAP[barcode_type]
+    output = BytesIO()
+    barcode_cls(value, writer=SVGWriter()).write(output, options=options)
+    expected = [
+        rect.attrib
+        for rect in ElementTree.fromstring(output.getvalue()).iter(SVG_RECT)
+        if rect.get("width") != "100%"
+    ]
 
-def test_invalid_barcode_type():
-    """Test invalid barcode type."""
-    generator = BarcodeGenerator()
-    result = generator.generate("invalid", "123456789012")
-    assert 'id="barcode_error"' in result
+    fragment = barcode_generator._bars_fragment(barcode_cls(value).build()[0], 0.33, 9)
+    actual = [
+        {key: val if key == "style" else f"{val}mm" for key, val in rect.attrib.items()}
+        for rect in ElementTree.fromstring(fragment)
+    ]
+    assert actual == expected
 
 
-def test_empty_value():
-    """Test empty barcode value."""
-    generator = BarcodeGenerator()
-    result = generator.generate("code128", "")
-    assert 'id="barcode_error"' in result
+@pytest.mark.parametrize(
+    "value,expected",
+    [(1.0000000000000002, "1"), (0.7142857142857144, "0.7143"), (12.5, "12.5"), (0, "0")],
+)
+def test_format_number(value, expected):
+    """Test coordinates are written with at most four decimals."""
+    assert barcode_generator.format_number(value) == expected
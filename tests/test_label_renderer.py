@@ -3,10 +3,14 @@ Tests for LabelRenderer
 """
 import json
 import pytest
-import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from xml.etree import ElementTree
 
 from barcode_label_printer import LabelRenderer
+from barcode_label_printer.renderer import label_renderer
+from barcode_label_printer.renderer.barcode_generator import BARCODE_MAP
+from barcode_label_printer.renderer.label_renderer import RawSvgContainer
 
 
 def test_renderer_initialization():
@@ -16,10 +20,8 @@ def test_renderer_initialization():
     assert renderer.barcode_generator is not None
 
 
-def test_render_simple_label():
-    """Test rendering a simple label."""
-    renderer = LabelRenderer()
-    
+def test_render_simple_label(renderer, tmp_path, has_svg_head):
+    """Test rendering a simple label to a file."""
     config = {
         "canvas": {
             "width_mm": 100,
@@ -35,88 +37,176 @@ def test_render_simple_label():
             }
         ]
     }
-    
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.svg', delete=False) as f:
-        output_path = f.name
-    
-    try:
-        renderer.render(config, output_path)
-        assert Path(output_path).exists()
-        assert Path(output_path).stat().st_size > 0
-        
-        with open(output_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            assert '<svg' in content.lower()
-            assert 'Test' in content
-    finally:
-        if Path(output_path).exists():
-            Path(output_path).unlink()
-
-
-def test_render_with_barcode():
-    """Test rendering label with barcode."""
+
+    output_path = tmp_path / "label.svg"
+    renderer.render(config, str(output_path))
+    # A single stat both proves the file exists and that it has content
+    assert output_path.stat().st_size > 0
+
+    content = output_path.read_bytes()
+    assert has_svg_head(content)
+    assert b'Test' in content
+
+
+def test_render_all_element_types(rendered_label, has_svg_head):
+    """Test a label with text, barcode and box elements renders each of them."""
+    assert has_svg_head(rendered_label)
+    assert 'Test Label' in rendered_label
+    assert 'id="barcode_group"' in rendered_label
+    assert '<rect x="5" y="40" width="90" height="5" fill="black"/>' in rendered_label
+
+
+@pytest.mark.parametrize(
+    "background",
+    [
+        '<rect width="100%" height="100%" style="fill:white"/>',
+        '<rect style="fill: #ffffff;" height="100%" width="100%" />',
+    ],
+)
+def test_raw_svg_container_strips_white_background(background):
+    """Test the white background rect is dropped from raw SVG fragments."""
+    container = RawSvgContainer(f'<g>{background}<rect x="1" y="2" width="3" height="4"/></g>')
+    elem = container.get_xml()
+    assert [child.attrib.get("x") for child in elem] == ["1"]
+
+
+def test_render_escapes_text(renderer):
+    """Test rendered labels are well-formed XML with escaped text."""
+    config = {
+        "canvas": {"width_mm": 50, "height_mm": 20},
+        "elements": [
+            {"type": "text", "value": 'A <&> "B"', "x_mm": 1, "y_mm": 1, "bg_color": "yellow"},
+            {"type": "barcode", "barcode_type": "code128", "value": "42", "x_mm": 1, "y_mm": 5},
+        ],
+    }
+    root = ElementTree.fromstring(renderer.render_to_string(config))
+    assert root.tag == "{http://www.w3.org/2000/svg}svg"
+    assert root.get("viewBox") == "0 0 50 20"
+    texts = [elem.text for elem in root.iter("{http://www.w3.org/2000/svg}text")]
+    assert texts == ['A <&> "B"']
+
+
+def test_render_picture_cached(renderer, tmp_path):
+    """Test picture files are parsed once and reloaded after they change."""
+    picture = tmp_path / "logo.svg"
+    picture.write_text(
+        '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 20 10">'
+        '<rect x="0" y="0" width="20" height="10" fill="blue"/></svg>',
+        encoding="utf-8",
+    )
+    config = {
+        "canvas": {"width_mm": 50, "height_mm": 20},
+        "elements": [
+            {"type": "picture", "svg_file": "logo.svg", "x_mm": 1, "y_mm": 1, "width_mm": 10}
+        ],
+    }
+    label_renderer._load_picture.cache_clear()
+    output_path = tmp_path / "label.svg"
+    renderer.render(config, str(output_path), config_path=str(tmp_path / "label.json"))
+    renderer.render(config, str(output_path), config_path=str(tmp_path / "label.json"))
+    assert label_renderer._load_picture.cache_info().misses == 1
+    assert b'scale(0.5,0.5)' in output_path.read_bytes()
+
+    picture.write_text(
+        '<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 40.0 10">'
+        '<rect x="0" y="0" width="40" height="10" fill="blue"/></svg>',
+        encoding="utf-8",
+    )
+    renderer.render(config, str(output_path), config_path=str(tmp_path / "label.json"))
+    assert b'scale(0.25,0.25)' in output_path.read_bytes()
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_render_batch(renderer, tmp_path, max_workers):
+    """Test batch rendering writes every label in job order."""
+    jobs = [
+        (
+            {
+                "canvas": {"width_mm": 50, "height_mm": 20},
+                "elements": [{"type": "text", "value": f"Label {i}", "x_mm": 1, "y_mm": 1}],
+            },
+            str(tmp_path / f"label_{i}.svg"),
+        )
+        for i in range(3)
+    ]
+    outputs = renderer.render_batch(jobs, max_workers=max_workers)
+
+    assert outputs == [job[1] for job in jobs]
+    for i, output in enumerate(outputs):
+        assert f"Label {i}".encode() in Path(output).read_bytes()
+
+
+def test_render_batch_uses_renderer_configuration(tmp_path):
+    """Test batch workers render with the calling renderer's barcode customizations."""
     renderer = LabelRenderer()
-    
+    renderer.barcode_generator.barcode_map["shipping"] = BARCODE_MAP["code128"]
     config = {
-        "canvas": {
-            "width_mm": 100,
-            "height_mm": 50
-        },
+        "canvas": {"width_mm": 60, "height_mm": 30},
         "elements": [
             {
                 "type": "barcode",
-                "barcode_type": "code128",
-                "value": "123456789012",
+                "barcode_type": "shipping",
+                "value": "SHIP-0001",
                 "x_mm": 5,
                 "y_mm": 5,
-                "width_mm": 80,
-                "height_mm": 20
+                "width_mm": 50,
+                "height_mm": 20,
             }
-        ]
+        ],
     }
-    
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.svg', delete=False) as f:
-        output_path = f.name
-    
-    try:
-        renderer.render(config, output_path)
-        assert Path(output_path).exists()
-        
-        with open(output_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            assert '<svg' in content.lower()
-    finally:
-        if Path(output_path).exists():
-            Path(output_path).unlink()
-
-
-def test_render_with_box():
-    """Test rendering label with box element."""
-    renderer = LabelRenderer()
-    
+    jobs = [(config, str(tmp_path / f"label_{i}.svg")) for i in range(2)]
+    outputs = renderer.render_batch(jobs, max_workers=2)
+
+    expected = renderer.render_to_string(config)
+    assert 'id="barcode_error"' not in expected
+    for output in outputs:
+        assert Path(output).read_text(encoding="utf-8") == expected
+
+
+def test_render_debug_writes_elements(renderer, tmp_path, monkeypatch):
+    """Test debug mode writes every element file before render returns."""
+    monkeypatch.chdir(tmp_path)
     config = {
-        "canvas": {
-            "width_mm": 100,
-            "height_mm": 50
-        },
+        "canvas": {"width_mm": 50, "height_mm": 20},
         "elements": [
-            {
-                "type": "box",
-                "x_mm": 5,
-                "y_mm": 5,
-                "width_mm": 90,
-                "height_mm": 40,
-                "fill_color": "black"
-            }
-        ]
+            {"type": "text", "value": "a/b:c", "x_mm": 1, "y_mm": 1},
+            {"type": "box", "x_mm": 2, "y_mm": 3, "width_mm": 4, "height_mm": 5},
+        ],
     }
-    
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.svg', delete=False) as f:
-        output_path = f.name
-    
-    try:
-        renderer.render(config, output_path)
-        assert Path(output_path).exists()
-    finally:
-        if Path(output_path).exists():
-            Path(output_path).unlink()
+    renderer.render(config, str(tmp_path / "label.svg"), debug=True)
+
+    debug_files = sorted(path.name for path in (tmp_path / "svg_debug").iterdir())
+    assert debug_files == ["box_at_2_3.svg", "text_a_b_c.svg"]
+
+
+def test_render_debug_concurrent_calls(renderer, tmp_path, monkeypatch):
+    """Test concurrent debug renders on one renderer each write all of their files."""
+    monkeypatch.chdir(tmp_path)
+    configs = [
+        {
+            "canvas": {"width_mm": 50, "height_mm": 20},
+            "elements": [
+                {"type": "box", "x_mm": i, "y_mm": j, "width_mm": 1, "height_mm": 1}
+                for j in range(20)
+            ],
+        }
+        for i in range(4)
+    ]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(
+            executor.map(
+                lambda i: renderer.render(configs[i], str(tmp_path / f"{i}.svg"), debug=True),
+                range(4),
+            )
+        )
+
+    assert len(list((tmp_path / "svg_debug").iterdir())) == 4 * 20
+
+
+def test_render_sample_configs(renderer, sample_configs, has_svg_head):
+    """Test the sample label configs shipped with the repository render."""
+    assert sample_configs
+    for config_path, config in sample_configs.items():
+        assert {"width_mm", "height_mm"} <= set(config["canvas"])
+        svg = renderer.render_to_string(config, config_path=str(config_path))
+        assert has_svg_head(svg)
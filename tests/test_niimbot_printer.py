@@ -0,0 +1,179 @@
+"""
+Tests for Niimbot packet handling and image encoding
+"""
+import pytest
+from PIL import Image, ImageDraw
+
+from barcode_label_printer.printer.niimbot.packet import NiimbotPacket
+from barcode_label_printer.printer.niimbot import transport as niimbot_transport
+from barcode_label_printer.printer.niimbot.printer import PrinterClient
+
+
+class FakeTransport:
+    """In-memory transport recording writes and serving queued reads."""
+
+    def __init__(self, incoming=b""):
+        self.incoming = bytearray(incoming)
+        self.writes = []
+
+    def read(self, length):
+        data = bytes(self.incoming[:length])
+        del self.incoming[:length]
+        return data
+
+    def write(self, data):
+        self.writes.append(data)
+
+    def close(self):
+        pass
+
+
+def _make_image(width, height):
+    """Create a test image with some black shapes."""
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([0, 0, width // 3, height // 2], fill="black")
+    draw.line([0, height - 1, width - 1, 0], fill="black")
+    return image
+
+
+def _reference_rows(image):
+    """Pack rows bit by bit, right-aligned like the Niimbot protocol expects."""
+    img = image.convert("L")
+    rows = []
+    for y in range(img.height):
+        bits = "".join("1" if img.getpixel((x, y)) < 128 else "0" for x in range(img.width))
+        rows.append(int(bits, 2).to_bytes((img.width + 7) // 8, "big"))
+    return rows
+
+
+def test_packet_to_bytes():
+    """Test packet serialization with checksum."""
+    packet = NiimbotPacket(0x01, b"\x01")
+    assert packet.to_bytes() == b"\x55\x55\x01\x01\x01\x01\xaa\xaa"
+
+
+def test_packet_round_trip():
+    """Test packet parsing from serialized bytes."""
+    packet = NiimbotPacket(0x85, bytes(range(48)))
+    parsed = NiimbotPacket.from_bytes(packet.to_bytes())
+    assert parsed.type == 0x85
+    assert parsed.data == bytes(range(48))
+
+
+def test_packet_wrap_frame():
+    """Test framing data written in place matches a regular packet."""
+    frame = bytearray(7 + 48)
+    frame[4:-3] = bytes(range(48))
+    packet = NiimbotPacket.wrap_frame(0x85, frame)
+    expected = NiimbotPacket(0x85, bytes(range(48)))
+    assert type(packet.to_bytes()) is bytes
+    assert packet.to_bytes() == expected.to_bytes()
+    assert type(packet.data) is bytes
+    assert packet.data == expected.data
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        b"\x55\x54\x01\x01\x01\x01\xaa\xaa",
+        b"\x55\x55\x01\x01\x01\x01\xaa\xab",
+        b"\x55\x55\x01\x01\x01\x02\xaa\xaa",
+        b"\x55\x55\x01\x02\x03\x07\xaa\xaa",
+        b"\x55\x55\x01\x01\x01\x00\x01\xaa\xaa",
+    ],
+)
+def test_packet_from_bytes_invalid(raw):
+    """Test malformed packets are rejected."""
+    with pytest.raises(ValueError):
+        NiimbotPacket.from_bytes(raw)
+
+
+@pytest.mark.parametrize("width", [384, 100, 7])
+def test_encode_image_rows(width):
+    """Test encoded image lines match the reference bit packing."""
+    image = _make_image(width, 12)
+    client = PrinterClient(transport=None)
+    packets = list(client._encode_image(image))
+
+    assert len(packets) == image.height
+    for y, (packet, expected) in enumerate(zip(packets, _reference_rows(image))):
+        assert packet.type == 0x85
+        assert packet.data[:2] == y.to_bytes(2, "big")
+        assert packet.data[6:] == expected
+
+
+def test_send_many_batches_writes():
+    """Test encoded image packets are sent in a few batched transport writes."""
+    transport = FakeTransport()
+    client = PrinterClient(transport)
+    packets = list(client._encode_image(_make_image(96, 100)))
+    client._send_many(iter(packets))
+
+    assert len(transport.writes) == 4
+    assert b"".join(transport.writes) == b"".join(packet.to_bytes() for packet in packets)
+
+
+def test_recv_keeps_partial_packet():
+    """Test received packets are split and partial data is kept for later."""
+    first = NiimbotPacket(0x02, b"\x01").to_bytes()
+    second = NiimbotPacket(0x41, b"\x00\x64").to_bytes()
+    transport = FakeTransport(first + second[:4])
+    client = PrinterClient(transport)
+
+    packets = client._recv()
+    assert [p.type for p in packets] == [0x02]
+
+    transport.incoming.extend(second[4:])
+    packets = client._recv()
+    assert [(p.type, p.data) for p in packets] == [(0x41, b"\x00\x64")]
+
+
+@pytest.mark.parametrize(
+    "corrupt",
+    [
+        b"\x55\x55\x02\x01\x01\x07\xaa\xaa",
+        b"\x00\x13\x55",
+    ],
+)
+def test_recv_skips_corrupt_data(corrupt):
+    """Test a corrupt frame or stray bytes are dropped instead of wedging the client."""
+    packet = NiimbotPacket(0x41, b"\x00\x64").to_bytes()
+    transport = FakeTransport(corrupt + packet)
+    client = PrinterClient(transport)
+
+    # Each call reads at most up to the next complete frame
+    packets = [packet for _ in range(3) for packet in client._recv()]
+    assert [(p.type, p.data) for p in packets] == [(0x41, b"\x00\x64")]
+    assert client._recv() == []
+
+
+def test_transceive_returns_response():
+    """Test a request returns the matching response packet."""
+    status = NiimbotPacket(0xB3, b"\x00" * 4).to_bytes()
+    response = NiimbotPacket(0x02, b"\x01").to_bytes()
+    transport = FakeTransport(status + response)
+    client = PrinterClient(transport)
+
+    assert client.start_print() is True
+    assert transport.writes == [NiimbotPacket(0x01, b"\x01").to_bytes()]
+
+
+def test_comports_rescan_after_invalidation(monkeypatch):
+    """Test the serial port scan is cached until invalidated or refreshed."""
+    scans = []
+    monkeypatch.setattr(niimbot_transport, "_comports_cache", (0.0, None))
+    monkeypatch.setattr(
+        niimbot_transport.list_ports, "comports", lambda: scans.append(1) or ["COM3"]
+    )
+
+    assert niimbot_transport.cached_comports() == ["COM3"]
+    niimbot_transport.cached_comports()
+    assert len(scans) == 1
+
+    niimbot_transport.invalidate_comports()
+    niimbot_transport.cached_comports()
+    assert len(scans) == 2
+
+    niimbot_transport.cached_comports(refresh=True)
+    assert len(scans) == 3
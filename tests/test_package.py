@@ -0,0 +1,48 @@
+"""
+Package smoke tests (formerly the self_test.py script)
+"""
+import pytest
+
+import barcode_label_printer
+from barcode_label_printer import SvgPrinter
+
+
+def test_package_exports():
+    """Test the core classes and version are exported."""
+    for name in ("BarcodeGenerator", "LabelRenderer", "SvgPrinter"):
+        assert name in barcode_label_printer.__all__
+    assert barcode_label_printer.__version__ not in ("", "0.0.0")
+
+
+def test_render_label(renderer, tmp_path, label_config, rendered_label):
+    """Test a label with text, barcode and box renders to a file."""
+    output_path = tmp_path / "test_label.svg"
+    renderer.render(label_config, str(output_path))
+
+    # The shared in-memory rendering is already checked element by element
+    assert output_path.read_text(encoding="utf-8") == rendered_label
+
+
+@pytest.fixture
+def niimbot_printer_class():
+    """NiimbotPrinter, imported only by the tests that need it; skips without pyserial."""
+    pytest.importorskip("serial")
+    from barcode_label_printer import NiimbotPrinter  # pylint: disable=import-outside-toplevel
+
+    return NiimbotPrinter
+
+
+def test_svg_printer_niimbot_ports(niimbot_printer_class):  # pylint: disable=unused-argument
+    """Test Niimbot serial port listing through SvgPrinter."""
+    assert isinstance(SvgPrinter().get_niimbot_serial_ports(), list)
+
+
+def test_niimbot_printer(niimbot_printer_class):
+    """Test NiimbotPrinter initialization, port listing and model validation."""
+    printer = niimbot_printer_class(model="b21", connection_type="usb")
+    assert printer.model == "b21"
+    assert printer.connection_type == "usb"
+    assert isinstance(niimbot_printer_class.list_serial_ports(), list)
+
+    with pytest.raises(ValueError):
+        niimbot_printer_class(model="invalid", connection_type="usb")
@@ -1,11 +1,21 @@
 """
 Tests for SvgPrinter
 """
+import io
+import os
+import queue
+import types
+
+import PyPDF2
 import pytest
+from PIL import Image
 
 from barcode_label_printer import SvgPrinter
+from barcode_label_printer.printer import svg_printer
+from barcode_label_printer.printer.niimbot import transport as niimbot_transport
 
 
+@pytest.mark.integration
 def test_printer_initialization():
     """Test SvgPrinter initialization."""
     printer = SvgPrinter()
@@ -13,21 +23,20 @@ def test_printer_initialization():
     assert printer.current_printer is None
 
 
-def test_get_available_printers():
+@pytest.mark.integration
+def test_get_available_printers(available_printers):
     """Test getting available printers."""
-    printer = SvgPrinter()
-    printers = printer.get_available_printers()
-    assert isinstance(printers, list)
+    assert isinstance(available_printers, list)
     # In CI environments, there may be no printers, which is OK
 
 
-def test_set_printer():
+@pytest.mark.integration
+def test_set_printer(available_printers):
     """Test setting printer."""
     printer = SvgPrinter()
-    printers = printer.get_available_printers()
-    
-    if printers:
-        result = printer.set_printer(printers[0])
+
+    if available_printers:
+        result = printer.set_printer(available_printers[0])
         # May fail if printer is not actually available, so we just check it doesn't crash
         assert isinstance(result, bool)
     else:
@@ -37,8 +46,298 @@ def test_set_printer():
         # In CI, this is expected behavior
 
 
+@pytest.mark.integration
 def test_get_current_printer():
     """Test getting current printer."""
     printer = SvgPrinter()
     current = printer.get_current_printer()
     assert current is None or isinstance(current, str)
+
+
+def test_availability_flags_are_lazy(monkeypatch):
+    """Test the legacy availability constants are computed from the lazy loaders."""
+    monkeypatch.setattr(svg_printer, "_have_win_print", lambda: False)
+    monkeypatch.setattr(svg_printer, "_get_niimbot_printer_class", lambda: None)
+    assert svg_printer.WINDOWS_PRINT_AVAILABLE is False
+    assert svg_printer.NIIMBOT_PRINT_AVAILABLE is False
+    with pytest.raises(AttributeError):
+        svg_printer.NiimbotPrinter  # pylint: disable=pointless-statement
+
+
+def test_svg_to_image_uses_raster_cache(tmp_path, monkeypatch):
+    """Test a cached raster is returned without rasterizing the SVG again."""
+    monkeypatch.setattr(svg_printer, "RASTER_CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(svg_printer, "_get_cairosvg", lambda: None)
+    svg_path = tmp_path / "label.svg"
+    svg_path.write_text("<svg xmlns='http://www.w3.org/2000/svg'/>")
+
+    monkeypatch.delenv("BARCODE_LABEL_PRINTER_RASTER_CACHE", raising=False)
+    assert SvgPrinter().use_raster_cache is False
+    printer = SvgPrinter(use_raster_cache=True)
+    assert printer._svg_to_image(str(svg_path)) is None
+
+    cache_path = printer._raster_cache_path(str(svg_path), 300)
+    png = io.BytesIO()
+    Image.new("RGBA", (8, 4), "black").save(png, "PNG")
+    printer._store_raster_cache(cache_path, png.getvalue())
+
+    image = printer._svg_to_image(str(svg_path))
+    assert image.size == (8, 4)
+    assert image.mode == "RGBA"
+    assert printer._raster_cache_path(str(svg_path), 203) != cache_path
+
+
+def test_raster_cache_evicts_oldest(tmp_path, monkeypatch):
+    """Test the raster cache keeps at most RASTER_CACHE_MAX_ENTRIES files."""
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(svg_printer, "RASTER_CACHE_DIR", cache_dir)
+    monkeypatch.setattr(svg_printer, "RASTER_CACHE_MAX_ENTRIES", 2)
+
+    printer = SvgPrinter()
+    for i in range(3):
+        printer._store_raster_cache(cache_dir / f"{i}.png", b"png")
+        os.utime(cache_dir / f"{i}.png", (i, i))
+
+    printer._store_raster_cache(cache_dir / "3.png", b"png")
+    assert sorted(path.name for path in cache_dir.iterdir()) == ["2.png", "3.png"]
+
+
+@pytest.mark.parametrize(
+    "attrs, expected",
+    [
+        ('width="101.6mm" height="50.8mm"', (4.0, 2.0)),
+        ('width="384" height="192px"', (4.0, 2.0)),
+        ('width="100%" height="1in"', None),
+        ("", None),
+    ],
+)
+def test_svg_size_inches(tmp_path, attrs, expected):
+    """Test reading the physical SVG size used to pick the rasterization DPI."""
+    svg_path = tmp_path / "label.svg"
+    svg_path.write_text(f"<svg xmlns='http://www.w3.org/2000/svg' {attrs}><rect/></svg>")
+
+    size = svg_printer._svg_size_inches(str(svg_path))
+    if expected is None:
+        assert size is None
+    else:
+        assert size == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("width, height, landscape", [(288, 144, True), (144, 288, False)])
+def test_is_pdf_landscape(tmp_path, width, height, landscape):
+    """Test PDF orientation detection from the first page's MediaBox."""
+    pdf_path = tmp_path / "label.pdf"
+    writer = PyPDF2.PdfWriter()
+    writer.add_blank_page(width=width, height=height)
+    with open(pdf_path, "wb") as f:
+        writer.write(f)
+
+    assert SvgPrinter()._is_pdf_landscape(str(pdf_path)) is landscape
+
+
+def test_find_in_program_files(tmp_path, monkeypatch):
+    """Test tool discovery only probes roots containing the install directory."""
+    empty_root = tmp_path / "Program Files"
+    empty_root.mkdir()
+    tool_root = tmp_path / "Program Files (x86)"
+    (tool_root / "Inkscape" / "bin").mkdir(parents=True)
+    (tool_root / "Inkscape" / "bin" / "inkscape.exe").write_bytes(b"")
+    roots = (str(tmp_path / "missing"), str(empty_root), str(tool_root))
+    monkeypatch.setattr(svg_printer, "PROGRAM_FILES_DIRS", roots)
+
+    candidates = ("inkscape.exe", os.path.join("bin", "inkscape.exe"))
+    found = svg_printer._find_in_program_files("inkscape", candidates)
+    assert found == str(tool_root / "Inkscape" / "bin" / "inkscape.exe")
+    assert svg_printer._find_in_program_files("SumatraPDF", ("SumatraPDF.exe",)) is None
+
+
+def test_print_svg_async_returns_future(tmp_path):
+    """Test background printing reports the result through a future."""
+    printer = SvgPrinter()
+    future = printer.print_svg_async(str(tmp_path / "missing.svg"))
+    assert future.result(timeout=5) is False
+
+
+class FakePowerShell:
+    """PowerShell session stand-in that never answers unless told to."""
+
+    def __init__(self):
+        self.stdin = io.StringIO()
+        self.killed = False
+
+    def poll(self):
+        return None
+
+    def kill(self):
+        self.killed = True
+
+    def terminate(self):
+        pass
+
+
+@pytest.mark.parametrize("reply, expected", [("OK\n", True), (None, False)])
+def test_print_pdf_fallback_reply(monkeypatch, reply, expected):
+    """Test the PowerShell fallback reports its status, and a stalled session is killed."""
+    printer = SvgPrinter()
+    session = FakePowerShell()
+
+    def start_session():
+        printer._ps_proc = session
+        printer._ps_lines = queue.Queue()
+        if reply is not None:
+            printer._ps_lines.put(reply)
+
+    monkeypatch.setattr(printer, "_start_ps_session", start_session)
+    monkeypatch.setattr(svg_printer, "PS_REPLY_TIMEOUT", 0.01)
+
+    assert printer._print_pdf_fallback("label.pdf") is expected
+    assert "Start-Process" in session.stdin.getvalue()
+    assert session.killed is not expected
+    assert (printer._ps_proc is None) is not expected
+
+
+def test_remove_when_released(tmp_path, monkeypatch):
+    """Test printed PDFs are deleted, and already-removed files are ignored."""
+    monkeypatch.setattr(svg_printer, "PDF_RELEASE_GRACE", 0)
+    pdf_path = tmp_path / "label.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4")
+    printer = SvgPrinter()
+
+    printer._remove_when_released(str(pdf_path))
+    assert not pdf_path.exists()
+    printer._remove_when_released(str(pdf_path))
+
+
+def test_print_svg_uses_a_pdf_per_job(tmp_path, monkeypatch):
+    """Test reprints of one SVG render to separate PDFs that are each cleaned up."""
+    svg_path = tmp_path / "label.svg"
+    svg_path.write_text("<svg xmlns='http://www.w3.org/2000/svg'/>")
+    printed = []
+
+    def fake_svg_to_pdf_cairo(svg_path, pdf_path):
+        with open(pdf_path, "wb") as f:
+            f.write(b"%PDF-1.4")
+        return pdf_path
+
+    def fake_print_pdf(pdf_path, printer_name=None):
+        printed.append(pdf_path)
+        return True
+
+    printer = SvgPrinter()
+    printer.current_printer = "Label Printer"
+    monkeypatch.setattr(svg_printer, "_have_win_print", lambda: False)
+    monkeypatch.setattr(svg_printer, "PDF_RELEASE_GRACE", 0)
+    monkeypatch.setattr(printer, "_svg_to_pdf_cairo", fake_svg_to_pdf_cairo)
+    monkeypatch.setattr(printer, "_print_pdf", fake_print_pdf)
+
+    assert printer.print_svg(str(svg_path)) is True
+    assert printer.print_svg(str(svg_path)) is True
+    assert len(set(printed)) == 2
+    assert not list(tmp_path.glob("*.pdf"))
+
+    printer._executor.shutdown(wait=True)
+    assert not any(os.path.exists(pdf_path) for pdf_path in printed)
+
+
+def test_print_svgs_batch_merges_into_one_job(tmp_path, monkeypatch):
+    """Test a batch is converted without Inkscape and printed as one merged PDF."""
+    svg_paths = []
+    for i in range(3):
+        svg_path = tmp_path / f"label{i}.svg"
+        svg_path.write_text("<svg xmlns='http://www.w3.org/2000/svg'/>")
+        svg_paths.append(svg_path)
+
+    label_pdfs = []
+
+    def fake_svg_to_pdf_cairo(svg_path, pdf_path):
+        label_pdfs.append(pdf_path)
+        writer = PyPDF2.PdfWriter()
+        writer.add_blank_page(width=144, height=72)
+        with open(pdf_path, "wb") as f:
+            writer.write(f)
+        return pdf_path
+
+    jobs = []
+
+    def fake_print_pdf(pdf_path, printer_name=None):
+        jobs.append((pdf_path, len(PyPDF2.PdfReader(pdf_path).pages)))
+        return True
+
+    printer = SvgPrinter()
+    monkeypatch.setattr(printer, "_svg_to_pdf_cairo", fake_svg_to_pdf_cairo)
+    monkeypatch.setattr(printer, "_print_pdf", fake_print_pdf)
+    monkeypatch.setattr(printer, "_ensure_inkscape", lambda: pytest.fail("Inkscape used"))
+
+    monkeypatch.setattr(svg_printer, "PDF_RELEASE_GRACE", 0)
+    assert printer.print_svgs_batch(svg_paths) is True
+    assert [pages for _, pages in jobs] == [3]
+    assert len(set(label_pdfs)) == 3
+    assert not any(os.path.exists(pdf_path) for pdf_path in label_pdfs)
+
+    # The merged PDF is only deleted in the background, once the job has been sent
+    printer._executor.shutdown(wait=True)
+    assert not os.path.exists(jobs[0][0])
+
+
+class FakePrinterDC:
+    """Printer device context recording the calls made on it."""
+
+    def __init__(self, calls):
+        self.calls = calls
+
+    def __getattr__(self, name):
+        def method(*args):
+            self.calls.append(name)
+            return 300 if name == "GetDeviceCaps" else None
+
+        return method
+
+
+def test_print_images_windows_uses_one_job(monkeypatch):
+    """Test a batch of images is printed with one DC and one document."""
+    calls = []
+    win = types.SimpleNamespace(
+        win32con=types.SimpleNamespace(
+            LOGPIXELSX=88, LOGPIXELSY=90, PHYSICALWIDTH=110, PHYSICALHEIGHT=111, HALFTONE=4
+        ),
+        win32gui=types.SimpleNamespace(SetStretchBltMode=lambda handle, mode: None),
+        win32print=types.SimpleNamespace(GetDefaultPrinter=lambda: "Label Printer"),
+        win32ui=types.SimpleNamespace(CreateDC=lambda: FakePrinterDC(calls)),
+        ImageWin=types.SimpleNamespace(
+            Dib=lambda image: types.SimpleNamespace(draw=lambda handle, box: calls.append("draw"))
+        ),
+    )
+    monkeypatch.setattr(svg_printer, "_get_win_print_modules", lambda: win)
+
+    printer = SvgPrinter()
+    images = [Image.new("RGB", (40, 20), "white") for _ in range(3)]
+    assert printer.print_images_windows(images) is True
+
+    assert calls.count("CreatePrinterDC") == 1
+    assert calls.count("StartDoc") == 1
+    assert calls.count("StartPage") == calls.count("draw") == calls.count("EndPage") == 3
+    assert calls[-2:] == ["EndDoc", "DeleteDC"]
+
+    calls.clear()
+    assert printer.print_images_windows(images[:1]) is True
+    assert "GetDeviceCaps" not in calls
+
+
+def test_niimbot_serial_ports_are_cached(monkeypatch):
+    """Test serial port scans go through the shared transport cache until invalidated."""
+    scans = []
+    monkeypatch.setattr(niimbot_transport, "_comports_cache", (0.0, None))
+    monkeypatch.setattr(
+        niimbot_transport.list_ports,
+        "comports",
+        lambda: scans.append(1) or [("COM3", "USB", "USB VID:PID")],
+    )
+    printer = SvgPrinter()
+
+    assert printer.get_niimbot_serial_ports()[0]["port"] == "COM3"
+    printer.get_niimbot_serial_ports()
+    assert len(scans) == 1
+
+    printer.invalidate_serial_ports()
+    printer.get_niimbot_serial_ports()
+    assert len(scans) == 2